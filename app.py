@@ -1,12 +1,26 @@
-from flask import Flask, render_template, jsonify, request, url_for
+from flask import Flask, render_template, jsonify, request, url_for, g, has_request_context, abort
+from werkzeug.middleware.proxy_fix import ProxyFix
 import requests
 import xmltodict
 import yaml
 from datetime import datetime, timedelta
 from dateutil.parser import parse
 import os
-from services import load_services
+import time
+from services import (
+    load_services, SlotReservations, IdempotencyStore,
+    ClientRateLimiter, UpstreamLimiter, Overloaded,
+    LatencyTracker, HedgeBudget, Hedger,
+    PhaseTimer, ProfileWindow, NULL_PHASE,
+    AssetBuildError, AssetManifest, build_assets,
+    WorkshopIndex,
+    WarmupState, start_warmup
+)
 from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import uuid
+import hmac
 
 def load_service_info():
     """Load service information from YAML file"""
@@ -14,10 +28,152 @@ def load_service_info():
         return yaml.safe_load(f)
 
 app = Flask(__name__, static_folder='static')
+# Deployments can override the defaults below with a Python settings file
+app.config.from_envvar('APP_SETTINGS', silent=True)
+app.config.setdefault('BATCH_MAX_ITEMS', 100)
+app.config.setdefault('BATCH_CONCURRENCY_PER_WORKSHOP', 4)
+app.config.setdefault('RESERVATION_LEASE_SECONDS', 30)
+app.config.setdefault('RESERVATION_BOOKED_SECONDS', 300)
+app.config.setdefault('IDEMPOTENCY_TTL_SECONDS', 24 * 60 * 60)
+app.config.setdefault('RATE_LIMIT_PER_SECOND', 0)  # 0 disables per-client rate limiting
+app.config.setdefault('RATE_LIMIT_BURST', 20)
+app.config.setdefault('UPSTREAM_MAX_IN_FLIGHT', 8)  # per workshop, 0 disables the cap
+app.config.setdefault('UPSTREAM_MAX_QUEUE', 32)
+app.config.setdefault('UPSTREAM_QUEUE_TIMEOUT', 2.0)
+app.config.setdefault('RETRY_AFTER_SECONDS', 1)
+app.config.setdefault('UPSTREAM_TIMEOUT_SECONDS', 10)  # availability read timeout before samples exist
+app.config.setdefault('UPSTREAM_TIMEOUT_P99_MULTIPLE', 3)  # afterwards: this multiple of the p99
+app.config.setdefault('UPSTREAM_MIN_TIMEOUT_SECONDS', 1)
+app.config.setdefault('UPSTREAM_BOOKING_TIMEOUT_SECONDS', 15)  # read timeout for booking calls
+app.config.setdefault('PROXY_FIX_X_FOR', 0)  # trusted proxies setting X-Forwarded-For
+app.config.setdefault('HEDGING_ENABLED', False)  # hedge availability GETs to slow workshops
+app.config.setdefault('HEDGE_PERCENTILE', 95)
+app.config.setdefault('HEDGE_BUDGET_RATIO', 0.05)  # at most ~5% extra upstream calls
+app.config.setdefault('HEDGE_MIN_SAMPLES', 20)
+app.config.setdefault('PROFILING_ENABLED', False)  # allow X-Profile header and /admin/profile
+app.config.setdefault('PROFILING_ADMIN_TOKEN', None)  # X-Admin-Token for /admin/profile, which is off until set
+app.config.setdefault('PROFILING_MAX_SECONDS', 300)  # wall-clock limit on a profile window
+app.config.setdefault('ASSET_BUNDLING_ENABLED', True)  # serve hashed, precompressed bundles
+app.config.setdefault('INITIAL_PAGE_SIZE', 24)  # slots rendered into the first page
+app.config.setdefault('SNAPSHOT_MAX_AGE_SECONDS', 300)
+app.config.setdefault('WARMUP_ENABLED', False)  # warm up before /ready reports ready
+app.config.setdefault('WARMUP_TIMEOUT_SECONDS', 10)
+
+# Behind a load balancer, take the client address from X-Forwarded-For so that rate limits
+# apply per client rather than per proxy
+if app.config['PROXY_FIX_X_FOR']:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_X_FOR'])
 
 # Load services from API documentation (removed config argument)
 services = load_services(os.path.join(os.path.dirname(__file__), 'services'))
 service_info = load_service_info()
+workshop_index = WorkshopIndex(services)
+
+# Shared session so connections to the workshops are pooled and reused across requests
+upstream = requests.Session()
+
+# Local slot leases and replayable booking results, shared by all booking endpoints
+reservations = SlotReservations(
+    lease_seconds=app.config['RESERVATION_LEASE_SECONDS'],
+    booked_seconds=app.config['RESERVATION_BOOKED_SECONDS']
+)
+idempotency_store = IdempotencyStore(ttl_seconds=app.config['IDEMPOTENCY_TTL_SECONDS'])
+
+# Hashed, precompressed front-end bundles; plain static files are used if the build fails
+BUNDLED_ENTRIES = ['js/booking.js']
+BUNDLED_STYLESHEETS = ['css/styles.css']
+asset_manifest = AssetManifest()
+if app.config['ASSET_BUNDLING_ENABLED']:
+    try:
+        asset_manifest = build_assets(app.static_folder, BUNDLED_ENTRIES, BUNDLED_STYLESHEETS)
+    except (AssetBuildError, OSError) as e:
+        app.logger.error(f"Asset bundling failed, serving unbundled assets: {e}")
+
+# Latest aggregated availability, used to render the first page without an extra round trip
+availability_snapshot = {'updated': None, 'times': []}
+
+# Admission control: per-client token buckets and a per-workshop upstream cap
+RATE_LIMITED_ENDPOINTS = {'get_times', 'book_appointment', 'book_batch'}
+rate_limiter = ClientRateLimiter(
+    rate=app.config['RATE_LIMIT_PER_SECOND'],
+    burst=app.config['RATE_LIMIT_BURST']
+)
+upstream_limiter = UpstreamLimiter(
+    max_in_flight=app.config['UPSTREAM_MAX_IN_FLIGHT'],
+    max_queue=app.config['UPSTREAM_MAX_QUEUE'],
+    queue_timeout=app.config['UPSTREAM_QUEUE_TIMEOUT'],
+    retry_after=app.config['RETRY_AFTER_SECONDS']
+)
+
+# Per-service latency drives the hedge delay for availability requests
+latency_tracker = LatencyTracker(min_samples=app.config['HEDGE_MIN_SAMPLES'])
+hedger = Hedger(
+    latency_tracker,
+    HedgeBudget(ratio=app.config['HEDGE_BUDGET_RATIO']),
+    percentile=app.config['HEDGE_PERCENTILE'],
+    # Room for every in-flight primary to a workshop plus a hedge for each
+    max_workers=2 * (app.config['UPSTREAM_MAX_IN_FLIGHT'] or 8)
+)
+
+@app.before_request
+def apply_rate_limit():
+    if request.endpoint not in RATE_LIMITED_ENDPOINTS:
+        return None
+    retry_after = rate_limiter.acquire(request.remote_addr)
+    if retry_after is None:
+        return None
+    response = jsonify({
+        'success': False,
+        'error': 'Too many requests, please slow down'
+    })
+    response.status_code = 429
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+# Profiling: per-request phase timings and an optional capture window
+PROFILED_ENDPOINTS = {'get_times', 'book_appointment', 'book_batch'}
+profile_window = None
+
+def profile_phase(name):
+    """Time a phase of the current request if it is being profiled"""
+    timer = g.get('phase_timer') if has_request_context() else None
+    return timer.phase(name) if timer else NULL_PHASE
+
+@app.before_request
+def start_profiling():
+    if not app.config['PROFILING_ENABLED'] or request.endpoint not in PROFILED_ENDPOINTS:
+        return None
+    in_window = profile_window is not None and profile_window.begin_request()
+    if in_window:
+        g.profile_window = profile_window
+    if in_window or request.headers.get('X-Profile'):
+        g.phase_timer = PhaseTimer()
+    return None
+
+@app.after_request
+def add_server_timing(response):
+    timer = g.get('phase_timer')
+    if timer is not None:
+        response.headers['Server-Timing'] = timer.server_timing()
+        app.logger.info(f"Profiled {request.path}: {response.headers['Server-Timing']}")
+    return response
+
+@app.teardown_request
+def finish_profiling(exc):
+    window = g.get('profile_window')
+    if window is not None:
+        window.end_request(g.get('phase_timer'))
+
+@app.errorhandler(Overloaded)
+def handle_overloaded(e):
+    app.logger.warning(f"Shedding request: {e}")
+    response = jsonify({
+        'success': False,
+        'error': 'Service is temporarily overloaded, please try again shortly'
+    })
+    response.status_code = 503
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response
 
 def get_vehicle_types(service_name):
     """Get supported vehicle types for a service"""
@@ -82,6 +238,25 @@ def build_url_with_params(base_url, path, params):
         url += '?' + '&'.join(param_strings)
     return url
 
+def availability_timeout(service_name):
+    """Read timeout for an availability request: a multiple of the workshop's p99 latency"""
+    p99 = latency_tracker.percentile(service_name, 99)
+    ceiling = app.config['UPSTREAM_TIMEOUT_SECONDS']
+    if p99 is None:
+        return ceiling
+    return min(ceiling, max(app.config['UPSTREAM_MIN_TIMEOUT_SECONDS'],
+                            p99 * app.config['UPSTREAM_TIMEOUT_P99_MULTIPLE']))
+
+def fetch_available_times(service, url, headers, timeout):
+    """Make one availability request and record its latency"""
+    with upstream_limiter.slot(service.name):
+        started = time.monotonic()
+        try:
+            return upstream.get(url, headers=headers, timeout=timeout)
+        finally:
+            # Timed-out attempts count too, so the timeout follows a workshop that slows down
+            latency_tracker.record(service.name, time.monotonic() - started)
+
 def get_service_times(service):
     print(f"Fetching times from {service.name}")
     
@@ -91,22 +266,32 @@ def get_service_times(service):
     url = build_url_with_params(service.base_url, service.available_times_path, params)
     print(f"Fetching from {url}")
     
-    response = requests.get(url, headers=headers)
+    timeout = availability_timeout(service.name)
+    with profile_phase(f"upstream-{service.name}"):
+        if app.config['HEDGING_ENABLED']:
+            # Bounded by the primary, a hedge and a wait in the upstream queue
+            response = hedger.call(
+                service.name, fetch_available_times, service, url, headers, timeout,
+                timeout=2 * timeout + app.config['UPSTREAM_QUEUE_TIMEOUT']
+            )
+        else:
+            response = fetch_available_times(service, url, headers, timeout)
     print(f"Response from {service.name}: {response.status_code}")
     if response.status_code != 200:
         print(f"Error fetching times from {service.name}: {response.text}")
         return []
 
     try:
-        if service.content_type == 'text/xml':
-            return handle_xml_response(response, service)
-        else:  # JSON handling
-            times = response.json()
-            if isinstance(times, list):
-                return handle_json_list_response(times, service)
-            elif isinstance(times, dict) and 'availableTimes' in times:
-                return handle_json_dict_response(times, service)
-        return []
+        with profile_phase('parse'):
+            if service.content_type == 'text/xml':
+                return handle_xml_response(response, service)
+            else:  # JSON handling
+                times = response.json()
+                if isinstance(times, list):
+                    return handle_json_list_response(times, service)
+                elif isinstance(times, dict) and 'availableTimes' in times:
+                    return handle_json_dict_response(times, service)
+            return []
     except Exception as e:
         app.logger.error(f"Error parsing response from {service.name}: {e}")
         return []
@@ -134,7 +319,9 @@ def book_v1_timeslot(service, booking_data, timeslot_id):
         'Accept': 'text/xml'
     }
     print(f"Booking timeslot {timeslot_id} at {service.name}, url: {url}, xml: {xml_data}")
-    response = requests.put(url, data=xml_data.encode('utf-8'), headers=headers)  # Encode XML data in UTF-8
+    with upstream_limiter.slot(service.name):
+        response = upstream.put(url, data=xml_data.encode('utf-8'), headers=headers,  # Encode XML data in UTF-8
+                                timeout=app.config['UPSTREAM_BOOKING_TIMEOUT_SECONDS'])
     
     if response.status_code != 200:
         raise Exception(f"Booking failed: {response.text}")
@@ -154,7 +341,9 @@ def book_v2_timeslot(service, booking_data, timeslot_id):
     }
     
     headers = {'Content-Type': 'application/json'}
-    response = requests.post(url, json=json_data, headers=headers)
+    with upstream_limiter.slot(service.name):
+        response = upstream.post(url, json=json_data, headers=headers,
+                                 timeout=app.config['UPSTREAM_BOOKING_TIMEOUT_SECONDS'])
     
     if response.status_code != 200:
         raise Exception(f"Booking failed: {response.status_code}")
@@ -165,6 +354,12 @@ def book_v2_timeslot(service, booking_data, timeslot_id):
         'status': 'confirmed'
     }
 
+def book_timeslot(service, booking_data):
+    """Book a timeslot using the API version the service speaks"""
+    if service.content_type == 'text/xml' or 'v1' in service.available_times_path:
+        return book_v1_timeslot(service, booking_data, booking_data['timeslotId'])
+    return book_v2_timeslot(service, booking_data, booking_data['timeslotId'])
+
 @app.route('/api/book', methods=['POST'])
 def book_appointment():
     data = request.get_json()
@@ -185,21 +380,46 @@ def book_appointment():
             'error': f"Invalid location: {data['location']}"
         }), 400
     
+    # Retries carrying a known idempotency key get the stored result back
+    idempotency_key = request.headers.get('Idempotency-Key')
+    fingerprint = (service.name, str(data['timeslotId']))
+    if idempotency_key:
+        stored = idempotency_store.get(idempotency_key)
+        if stored:
+            stored_fingerprint, stored_body = stored
+            if stored_fingerprint != fingerprint:
+                return jsonify({
+                    'success': False,
+                    'error': 'Idempotency key was already used for a different booking'
+                }), 422
+            return jsonify(stored_body)
+    
+    owner = idempotency_key or uuid.uuid4().hex
+    if not reservations.acquire(service.name, data['timeslotId'], owner):
+        return jsonify({
+            'success': False,
+            'error': 'Timeslot is already being booked'
+        }), 409
+    
     try:
-        # Choose booking function based on API version
-        if service.content_type == 'text/xml' or 'v1' in service.available_times_path:
-            result = book_v1_timeslot(service, data, data['timeslotId'])
-        else:
-            result = book_v2_timeslot(service, data, data['timeslotId'])
+        result = book_timeslot(service, data)
+        reservations.mark_booked(service.name, data['timeslotId'], owner)
         
-        return jsonify({
+        body = {
             'success': True,
             'booking_id': result['booking_id'],
             'status': result['status'],
             'message': 'Booking confirmed successfully'
-        })
+        }
+        if idempotency_key:
+            idempotency_store.put(idempotency_key, fingerprint, body)
+        return jsonify(body)
         
+    except Overloaded:
+        reservations.release(service.name, data['timeslotId'], owner)
+        raise
     except Exception as e:
+        reservations.release(service.name, data['timeslotId'], owner)
         app.logger.error(f"Booking error: {str(e)}")
         return jsonify({
             'success': False,
@@ -207,24 +427,390 @@ def book_appointment():
             'message': str(e)
         }), 500
 
+def _batch_item_result(index, item, **fields):
+    """Build a per-item result entry for a batch booking response"""
+    return {
+        'index': index,
+        'timeslotId': item.get('timeslotId') if isinstance(item, dict) else None,
+        'location': item.get('location') if isinstance(item, dict) else None,
+        **fields
+    }
+
+def _is_scalar(value):
+    """Check that a batch item field is a plain string or number"""
+    return isinstance(value, (str, int, float)) and not isinstance(value, bool)
+
+def _book_batch_item(service, index, item, semaphore, owner):
+    """Book a single batch item while holding its workshop's concurrency slot"""
+    with semaphore:
+        try:
+            result = book_timeslot(service, item)
+            reservations.mark_booked(service.name, item['timeslotId'], owner)
+            return _batch_item_result(
+                index, item,
+                success=True,
+                booking_id=result['booking_id'],
+                status=result['status']
+            )
+        except Overloaded as e:
+            reservations.release(service.name, item['timeslotId'], owner)
+            return _batch_item_result(
+                index, item,
+                success=False,
+                error='Workshop is temporarily overloaded',
+                retryAfter=e.retry_after
+            )
+        except Exception as e:
+            reservations.release(service.name, item['timeslotId'], owner)
+            app.logger.error(f"Batch booking error for {service.name}: {str(e)}")
+            return _batch_item_result(
+                index, item,
+                success=False,
+                error='Failed to process booking',
+                message=str(e)
+            )
+
+@app.route('/api/book/batch', methods=['POST'])
+def book_batch():
+    data = request.get_json(silent=True)
+    bookings = data.get('bookings') if isinstance(data, dict) else None
+
+    if not isinstance(bookings, list) or not bookings:
+        return jsonify({
+            'success': False,
+            'error': "Request must contain a non-empty 'bookings' list"
+        }), 400
+
+    max_items = app.config['BATCH_MAX_ITEMS']
+    if len(bookings) > max_items:
+        return jsonify({
+            'success': False,
+            'error': f"Too many bookings in batch (max {max_items})"
+        }), 400
+
+    # Like /api/book, only successful bookings are stored under the idempotency key: a retry
+    # replays the items that were booked and re-runs the ones that failed
+    idempotency_key = request.headers.get('Idempotency-Key')
+    fingerprint = ('batch', tuple(sorted(
+        (str(item.get('location')), str(item.get('timeslotId')))
+        for item in bookings if isinstance(item, dict)
+    )))
+    booked_before = {}  # (location, timeslotId) -> stored result
+    if idempotency_key:
+        stored = idempotency_store.get(idempotency_key)
+        if stored:
+            stored_fingerprint, booked_before = stored
+            if stored_fingerprint != fingerprint:
+                return jsonify({
+                    'success': False,
+                    'error': 'Idempotency key was already used for a different booking'
+                }), 422
+
+    results = [None] * len(bookings)
+    groups = {}  # service name -> [(index, item)]
+    seen = set()
+    services_by_name = {s.name: s for s in services}
+    owner = idempotency_key or uuid.uuid4().hex
+
+    # Reject invalid items and duplicate slots locally, before any upstream call
+    for index, item in enumerate(bookings):
+        if not isinstance(item, dict) or not validate_booking_data(item):
+            results[index] = _batch_item_result(index, item, success=False, error='Missing required fields')
+            continue
+
+        if not _is_scalar(item['timeslotId']):
+            results[index] = _batch_item_result(index, item, success=False, error='Invalid timeslotId')
+            continue
+
+        service = services_by_name.get(item['location']) if _is_scalar(item['location']) else None
+        if not service:
+            results[index] = _batch_item_result(
+                index, item, success=False, error=f"Invalid location: {item['location']}"
+            )
+            continue
+
+        key = (str(item['location']), str(item['timeslotId']))
+        if key in seen:
+            results[index] = _batch_item_result(
+                index, item, success=False, error='Duplicate timeslot in batch'
+            )
+            continue
+        seen.add(key)
+
+        if key in booked_before:
+            results[index] = {**booked_before[key], 'index': index}
+            continue
+
+        if not reservations.acquire(service.name, item['timeslotId'], owner):
+            results[index] = _batch_item_result(
+                index, item, success=False, error='Timeslot is already being booked'
+            )
+            continue
+        groups.setdefault(service.name, []).append((index, item))
+
+    # Run each workshop's bookings concurrently, bounded per workshop
+    limit = max(1, app.config['BATCH_CONCURRENCY_PER_WORKSHOP'])
+    workers = sum(min(limit, len(items)) for items in groups.values())
+    if workers:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = []
+            for name, items in groups.items():
+                semaphore = threading.BoundedSemaphore(limit)
+                service = services_by_name[name]
+                for index, item in items:
+                    futures.append(executor.submit(_book_batch_item, service, index, item, semaphore, owner))
+            for future in futures:
+                result = future.result()
+                results[result['index']] = result
+
+    succeeded = sum(1 for r in results if r['success'])
+    body = {
+        'success': succeeded == len(results),
+        'booked': succeeded,
+        'failed': len(results) - succeeded,
+        'results': results
+    }
+    booked = {(str(r['location']), str(r['timeslotId'])): r for r in results if r['success']}
+    if idempotency_key and booked:
+        idempotency_store.put(idempotency_key, fingerprint, booked)
+    return jsonify(body)
+
+@app.context_processor
+def inject_asset_url():
+    def asset_url(source):
+        filename = asset_manifest.filename_for(source)
+        if filename:
+            return url_for('serve_asset', filename=filename)
+        return url_for('static', filename=source)
+    return {'asset_url': asset_url}
+
+@app.route('/assets/<filename>')
+def serve_asset(filename):
+    asset = asset_manifest.by_filename.get(filename)
+    if asset is None:
+        abort(404)
+
+    coding = asset.negotiate(request.headers.get('Accept-Encoding', ''))
+    response = app.response_class(asset.variants[coding], content_type=asset.content_type)
+    if coding != 'identity':
+        response.headers['Content-Encoding'] = coding
+    response.headers['Vary'] = 'Accept-Encoding'
+    # Filenames change with content, so responses never need revalidation
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+def get_initial_times():
+    """Return the first page of the availability snapshot, if it is recent enough"""
+    updated = availability_snapshot['updated']
+    if updated is None or time.monotonic() - updated > app.config['SNAPSHOT_MAX_AGE_SECONDS']:
+        return []
+
+    initial_times = []
+    for t in availability_snapshot['times']:
+        if len(initial_times) >= app.config['INITIAL_PAGE_SIZE']:
+            break
+        if not reservations.is_held(t['location'], t['id']):
+            initial_times.append(t)
+    return initial_times
+
 @app.route('/')
 def index():
-    return render_template('index.html')
+    # Embedded as JSON and rendered by booking.js, so times are shown in the browser's time zone
+    return render_template('index.html', initial_times=get_initial_times())
 
-@app.route('/api/times')
-def get_times():
+def collect_times(services_to_query):
+    """
+    Fetch, merge and sort availability from the given services.
+
+    Workshops that are overloaded are skipped, so the result can be partial. Returns
+    (times, shed) where shed names the skipped workshops; raises Overloaded only when every
+    queried workshop was skipped.
+    """
     all_times = []
+    shed = []
     
-    for service in services:
+    for service in services_to_query:
         try:
             service_times = get_service_times(service)
             print(f"Number of times from {service.name}: {len(service_times)}")
             all_times.extend(service_times)
+        except Overloaded as e:
+            app.logger.warning(f"Skipping overloaded workshop: {e}")
+            shed.append(e)
         except Exception as e:
             app.logger.error(f"Error fetching times from {service.name}: {e}")
     
+    if shed and len(shed) == len(services_to_query):
+        raise max(shed, key=lambda e: e.retry_after)
+    
+    with profile_phase('sort'):
+        all_times.sort(key=lambda x: parse(x['time']))
+    return all_times, [e.service_name for e in shed]
+
+def parse_position_args(args):
+    """
+    Read the optional lat/lon/radius/nearest query parameters of /api/times.
+
+    Returns (position, error): position is None when no position was given, otherwise a
+    (latitude, longitude, radius_km, nearest) tuple; error is a message for invalid input.
+    """
+    names = ('lat', 'lon', 'radius', 'nearest')
+    if not any(name in args for name in names):
+        return None, None
+    if 'lat' not in args or 'lon' not in args:
+        return None, "Both 'lat' and 'lon' are required for a position search"
+    if 'radius' not in args and 'nearest' not in args:
+        return None, "A position search needs 'radius' (km) and/or 'nearest' (count)"
+
+    try:
+        latitude = float(args['lat'])
+        longitude = float(args['lon'])
+        radius_km = float(args['radius']) if 'radius' in args else None
+        nearest = int(args['nearest']) if 'nearest' in args else None
+    except ValueError:
+        return None, 'Invalid position search parameters'
+
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return None, 'Coordinates out of range'
+    if (radius_km is not None and radius_km <= 0) or (nearest is not None and nearest < 1):
+        return None, "'radius' and 'nearest' must be positive"
+    return (latitude, longitude, radius_km, nearest), None
+
+@app.route('/api/times')
+def get_times():
+    position, error = parse_position_args(request.args)
+    if error:
+        return jsonify({'success': False, 'error': error}), 400
+
+    if position is None:
+        all_times, shed = collect_times(services)
+        # A partial result would hide whole workshops from the first page, so keep the old one
+        if not shed:
+            availability_snapshot.update(updated=time.monotonic(), times=all_times)
+    else:
+        # Only the matching workshops are queried upstream
+        latitude, longitude, radius_km, nearest = position
+        if nearest is not None:
+            matches = workshop_index.nearest(latitude, longitude, k=nearest, radius_km=radius_km)
+        else:
+            matches = workshop_index.within(latitude, longitude, radius_km)
+        distances = {service.name: round(km, 1) for service, km in matches}
+        all_times, shed = collect_times([service for service, _ in matches])
+        for t in all_times:
+            t['distanceKm'] = distances[t['location']]
+
+    with profile_phase('jsonify'):
+        response = jsonify(all_times)
+    if shed:
+        response.headers['X-Unavailable-Workshops'] = ', '.join(shed)
+    return response
+
+# Warm-up: resolve hosts, open pooled connections and fill the availability snapshot
+warmup_state = WarmupState(
+    WarmupState.PENDING if app.config['WARMUP_ENABLED'] else WarmupState.READY
+)
+
+def store_warmup_times(results):
+    all_times = [t for service_times in results for t in service_times]
     all_times.sort(key=lambda x: parse(x['time']))
-    return jsonify(all_times)
+    availability_snapshot.update(updated=time.monotonic(), times=all_times)
+
+# Started lazily so that each worker of a preforking server warms up itself rather than
+# leaving the thread behind in the parent process
+warmup_lock = threading.Lock()
+warmup_pid = None
+
+def ensure_warmup():
+    """Start this process's warm-up if it has not been started yet"""
+    global warmup_pid
+    if not app.config['WARMUP_ENABLED'] or warmup_pid == os.getpid():
+        return
+    with warmup_lock:
+        if warmup_pid == os.getpid():
+            return
+        warmup_pid = os.getpid()
+        start_warmup(
+            warmup_state, services, get_service_times,
+            timeout=app.config['WARMUP_TIMEOUT_SECONDS'],
+            on_complete=store_warmup_times
+        )
+
+@app.before_request
+def start_warmup_on_first_request():
+    ensure_warmup()
+
+@app.route('/ready')
+def readiness():
+    state = warmup_state.as_dict()
+    return jsonify(state), (200 if state['ready'] else 503)
+
+def _profiling_admin_allowed():
+    if not app.config['PROFILING_ENABLED']:
+        return False
+    token = app.config['PROFILING_ADMIN_TOKEN']
+    return bool(token) and hmac.compare_digest(request.headers.get('X-Admin-Token', ''), token)
+
+@app.route('/admin/profile', methods=['POST'])
+def start_profile_window():
+    global profile_window
+    if not _profiling_admin_allowed():
+        return jsonify({'success': False, 'error': 'Not found'}), 404
+
+    if profile_window is not None and not profile_window.finished.is_set():
+        return jsonify({
+            'success': False,
+            'error': 'A profile window is already running',
+            'remaining': profile_window.remaining
+        }), 409
+
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({'success': False, 'error': 'Request body must be a JSON object'}), 400
+    try:
+        profile_window = ProfileWindow(
+            requests=int(data.get('requests', 100)),
+            mode=data.get('mode', 'cpu'),
+            max_seconds=app.config['PROFILING_MAX_SECONDS']
+        )
+    except (TypeError, ValueError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    return jsonify({
+        'success': True,
+        'mode': profile_window.mode,
+        'requests': profile_window.requests,
+        'maxSeconds': profile_window.max_seconds
+    }), 202
+
+@app.route('/admin/profile', methods=['DELETE'])
+def stop_profile_window():
+    if not _profiling_admin_allowed():
+        return jsonify({'success': False, 'error': 'Not found'}), 404
+    if profile_window is None:
+        return jsonify({'success': False, 'error': 'No profile window has been started'}), 404
+
+    # Finishes early; whatever was captured so far stays available for export
+    profile_window.stop()
+    return jsonify({'success': True, 'finished': True})
+
+@app.route('/admin/profile', methods=['GET'])
+def get_profile_window():
+    if not _profiling_admin_allowed():
+        return jsonify({'success': False, 'error': 'Not found'}), 404
+    if profile_window is None:
+        return jsonify({'success': False, 'error': 'No profile window has been started'}), 404
+
+    if not profile_window.finished.is_set() or request.args.get('format') != 'folded':
+        return jsonify({
+            'success': True,
+            'mode': profile_window.mode,
+            'finished': profile_window.finished.is_set(),
+            'remaining': profile_window.remaining,
+            'phaseTotalsMs': {name: round(seconds * 1000, 2)
+                              for name, seconds in profile_window.phase_totals.items()}
+        })
+
+    return app.response_class(profile_window.folded(), mimetype='text/plain')
 
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
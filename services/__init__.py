@@ -5,8 +5,30 @@ which are later used to communicate with different tire workshop APIs.
 
 Modules:
     service_loader: Contains the Service dataclass and load_services() function.
+    reservations: Contains the SlotReservations lease table and IdempotencyStore.
+    admission: Contains the ClientRateLimiter and UpstreamLimiter used for load shedding.
+    hedging: Contains the LatencyTracker and Hedger used for hedged availability requests.
+    profiling: Contains the PhaseTimer and ProfileWindow used for opt-in request profiling.
+    assets: Contains build_assets() for hashed, precompressed front-end bundles.
+    geo: Contains the WorkshopIndex used for nearest-workshop searches.
+    warmup: Contains the worker warm-up routine and its WarmupState.
 """
 
 from .service_loader import load_services, Service
+from .reservations import SlotReservations, IdempotencyStore
+from .admission import ClientRateLimiter, UpstreamLimiter, Overloaded
+from .hedging import LatencyTracker, HedgeBudget, Hedger
+from .profiling import PhaseTimer, ProfileWindow, NULL_PHASE
+from .assets import AssetBuildError, AssetManifest, build_assets
+from .geo import WorkshopIndex, haversine_km
+from .warmup import WarmupState, run_warmup, start_warmup
 
-__all__ = ['load_services', 'Service']
+__all__ = [
+    'load_services', 'Service', 'SlotReservations', 'IdempotencyStore',
+    'ClientRateLimiter', 'UpstreamLimiter', 'Overloaded',
+    'LatencyTracker', 'HedgeBudget', 'Hedger',
+    'PhaseTimer', 'ProfileWindow', 'NULL_PHASE',
+    'AssetBuildError', 'AssetManifest', 'build_assets',
+    'WorkshopIndex', 'haversine_km',
+    'WarmupState', 'run_warmup', 'start_warmup'
+]
@@ -0,0 +1,179 @@
+"""
+This module provides admission control primitives that keep traffic spikes from turning into
+a pile of blocked workers waiting on the workshop APIs.
+
+Module Contents:
+    - Overloaded: Exception raised when a request is shed instead of queued.
+    - ClientRateLimiter: Per-client token buckets for incoming API requests.
+    - UpstreamLimiter: Per-workshop cap on in-flight upstream calls with a bounded wait queue.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Hashable, Iterator, Optional
+
+
+class Overloaded(Exception):
+    """
+    Raised when a workshop's in-flight limit and wait queue are both exhausted.
+
+    Attributes:
+        service_name (str): The workshop whose upstream calls are saturated.
+        retry_after (int): Seconds the client should wait before retrying.
+    """
+
+    def __init__(self, service_name: str, retry_after: int):
+        super().__init__(f"Too many pending requests to {service_name}")
+        self.service_name = service_name
+        self.retry_after = retry_after
+
+
+class ClientRateLimiter:
+    """
+    Token bucket rate limiter keyed by client.
+
+    Every client starts with a full bucket of ``burst`` tokens that refills at ``rate`` tokens
+    per second; each admitted request takes one token. A rate of zero or less disables limiting.
+
+    Attributes:
+        rate (float): Tokens added per second.
+        burst (int): Bucket capacity.
+        max_clients (int): Hard cap on kept buckets; beyond it the least recently seen client's
+            bucket is dropped, which at worst gives that client a fresh burst.
+    """
+
+    def __init__(self, rate: float = 0, burst: int = 10, max_clients: int = 10000,
+                 clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._clock = clock
+        self._lock = threading.Lock()
+        # client -> [tokens, last refill time], least recently seen first
+        self._buckets: 'OrderedDict[Hashable, list]' = OrderedDict()
+
+    def _refill(self, bucket: list, now: float) -> None:
+        bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+        bucket[1] = now
+
+    def acquire(self, client: Hashable) -> Optional[int]:
+        """
+        Take a token for the given client.
+
+        Args:
+            client (Hashable): Identifier of the caller, e.g. its remote address.
+
+        Returns:
+            Optional[int]: None if the request is admitted; otherwise the number of seconds
+            until the client's next token becomes available.
+        """
+        if self.rate <= 0:
+            return None
+
+        with self._lock:
+            now = self._clock()
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                while len(self._buckets) >= max(1, self.max_clients):
+                    self._buckets.popitem(last=False)
+                bucket = self._buckets[client] = [float(self.burst), now]
+            else:
+                self._buckets.move_to_end(client)
+                self._refill(bucket, now)
+
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return None
+            return max(1, math.ceil((1 - bucket[0]) / self.rate))
+
+    def clear(self) -> None:
+        """Drop all buckets."""
+        with self._lock:
+            self._buckets.clear()
+
+
+class _Gate:
+    """In-flight and waiting counters for a single workshop."""
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.in_flight = 0
+        self.waiting = 0
+
+
+class UpstreamLimiter:
+    """
+    Caps concurrent upstream calls per workshop.
+
+    Calls beyond ``max_in_flight`` wait in a queue of at most ``max_queue`` entries for up to
+    ``queue_timeout`` seconds; anything beyond that is rejected with ``Overloaded`` so that the
+    caller can answer quickly instead of tying up a worker. A ``max_in_flight`` of zero or less
+    disables the cap.
+
+    Attributes:
+        max_in_flight (int): Concurrent calls allowed per workshop.
+        max_queue (int): Calls allowed to wait for a free slot per workshop.
+        queue_timeout (float): Seconds a queued call waits before being shed.
+        retry_after (int): Retry-After value reported with ``Overloaded``.
+    """
+
+    def __init__(self, max_in_flight: int = 8, max_queue: int = 32,
+                 queue_timeout: float = 2.0, retry_after: int = 1):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+        self._gates: Dict[str, _Gate] = {}
+
+    def _gate(self, service_name: str) -> _Gate:
+        with self._lock:
+            gate = self._gates.get(service_name)
+            if gate is None:
+                gate = self._gates[service_name] = _Gate()
+            return gate
+
+    def in_flight(self, service_name: str) -> int:
+        """Return the number of calls currently running against a workshop."""
+        return self._gate(service_name).in_flight
+
+    @contextmanager
+    def slot(self, service_name: str) -> Iterator[None]:
+        """
+        Hold one in-flight slot for the given workshop for the duration of the block.
+
+        Args:
+            service_name (str): The workshop the upstream call goes to.
+
+        Raises:
+            Overloaded: If the wait queue is full or no slot frees up in time.
+        """
+        if self.max_in_flight <= 0:
+            yield
+            return
+
+        gate = self._gate(service_name)
+        with gate.condition:
+            if gate.in_flight >= self.max_in_flight:
+                if gate.waiting >= self.max_queue:
+                    raise Overloaded(service_name, self.retry_after)
+                gate.waiting += 1
+                try:
+                    admitted = gate.condition.wait_for(
+                        lambda: gate.in_flight < self.max_in_flight, self.queue_timeout
+                    )
+                finally:
+                    gate.waiting -= 1
+                if not admitted:
+                    raise Overloaded(service_name, self.retry_after)
+            gate.in_flight += 1
+
+        try:
+            yield
+        finally:
+            with gate.condition:
+                gate.in_flight -= 1
+                gate.condition.notify()
@@ -0,0 +1,258 @@
+"""
+This module bundles the front-end assets into content-hashed, precompressed files.
+
+The browser would otherwise discover booking.js, then its imports one round trip later, all
+under unversioned URLs that cannot be cached for long. At startup the ES module graph of each
+entry point is flattened into a single module, every asset is named after a hash of its
+content, and gzip (and brotli, when the optional ``brotli`` package is installed) variants are
+compressed once up front. Because a new build means a new filename, the files can be served
+with far-future immutable cache headers.
+
+The bundler understands the import/export forms used in static/js: named and default imports
+of relative modules, ``export function|class|const|let``, ``export { ... }`` and
+``export default <name>``. Anything else raises ``AssetBuildError`` so that a broken bundle is
+never served.
+
+Module Contents:
+    - AssetBuildError: Raised when an asset cannot be bundled.
+    - Asset: A built asset with its encoded variants.
+    - AssetManifest: Maps source paths to built assets.
+    - bundle_module: Flattens an ES module graph into a single module.
+    - build_assets: Builds the manifest for a static folder.
+"""
+
+import gzip
+import hashlib
+import logging
+import os
+import posixpath
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+_IMPORT_RE = re.compile(
+    r"^import\s+(?:(?P<default>[A-Za-z_$][\w$]*)\s*(?:,\s*)?)?(?:\{(?P<named>[^}]*)\})?\s*"
+    r"from\s+['\"](?P<path>\.{1,2}/[^'\"]+)['\"]\s*;?\s*$",
+    re.MULTILINE
+)
+_EXPORT_DECL_RE = re.compile(r"^export\s+(?:async\s+)?(function\*?|class|const|let|var)\s+([A-Za-z_$][\w$]*)", re.MULTILINE)
+_EXPORT_LIST_RE = re.compile(r"^export\s*\{(?P<names>[^}]*)\}\s*;?\s*$", re.MULTILINE)
+_EXPORT_DEFAULT_RE = re.compile(r"^export\s+default\s+(?P<name>[A-Za-z_$][\w$]*)\s*;?\s*$", re.MULTILINE)
+
+CONTENT_TYPES = {
+    '.js': 'text/javascript; charset=utf-8',
+    '.css': 'text/css; charset=utf-8',
+}
+
+
+class AssetBuildError(Exception):
+    """Raised when an asset uses syntax the bundler does not support."""
+
+
+@dataclass
+class Asset:
+    """
+    A built, content-hashed asset.
+
+    Attributes:
+        source (str): Path of the source file relative to the static folder.
+        filename (str): Hashed filename the asset is served under.
+        content_type (str): MIME type for the response.
+        variants (Dict[str, bytes]): Body per content coding ('identity', 'gzip', 'br').
+    """
+    source: str
+    filename: str
+    content_type: str
+    variants: Dict[str, bytes] = field(default_factory=dict)
+
+    def negotiate(self, accept_encoding: str) -> str:
+        """
+        Pick the best available content coding for an Accept-Encoding header.
+
+        Args:
+            accept_encoding (str): The request's Accept-Encoding header value.
+
+        Returns:
+            str: 'br', 'gzip' or 'identity'.
+        """
+        accepted = {part.split(';')[0].strip().lower() for part in (accept_encoding or '').split(',')}
+        for coding in ('br', 'gzip'):
+            if coding in accepted and coding in self.variants:
+                return coding
+        return 'identity'
+
+
+@dataclass
+class AssetManifest:
+    """
+    Built assets, addressable by source path or by hashed filename.
+
+    Attributes:
+        by_source (Dict[str, Asset]): Assets keyed by path relative to the static folder.
+        by_filename (Dict[str, Asset]): Assets keyed by hashed filename.
+    """
+    by_source: Dict[str, Asset] = field(default_factory=dict)
+    by_filename: Dict[str, Asset] = field(default_factory=dict)
+
+    def add(self, asset: Asset) -> None:
+        self.by_source[asset.source] = asset
+        self.by_filename[asset.filename] = asset
+
+    def filename_for(self, source: str) -> Optional[str]:
+        """Return the hashed filename for a source path, if it was built."""
+        asset = self.by_source.get(source)
+        return asset.filename if asset else None
+
+
+def _split_names(names: str) -> List[str]:
+    result = []
+    for name in names.split(','):
+        name = name.strip()
+        if not name:
+            continue
+        if ' as ' in name:
+            raise AssetBuildError(f"Renamed imports/exports are not supported: {name}")
+        result.append(name)
+    return result
+
+
+def _module_var(path: str) -> str:
+    return '__module_' + re.sub(r'\W', '_', path)
+
+
+def _strip_exports(source: str, path: str):
+    """Remove export syntax from a module and return (code, exported names, default name)."""
+    exported = [m.group(2) for m in _EXPORT_DECL_RE.finditer(source)]
+    code = _EXPORT_DECL_RE.sub(lambda m: m.group(0)[len('export '):].lstrip(), source)
+
+    for m in _EXPORT_LIST_RE.finditer(code):
+        exported.extend(_split_names(m.group('names')))
+    code = _EXPORT_LIST_RE.sub('', code)
+
+    default = None
+    defaults = list(_EXPORT_DEFAULT_RE.finditer(code))
+    if len(defaults) > 1:
+        raise AssetBuildError(f"Multiple default exports in {path}")
+    if defaults:
+        default = defaults[0].group('name')
+        code = _EXPORT_DEFAULT_RE.sub('', code)
+
+    if re.search(r'^export\s', code, re.MULTILINE):
+        raise AssetBuildError(f"Unsupported export syntax in {path}")
+    return code, exported, default
+
+
+def bundle_module(static_folder: str, entry: str) -> str:
+    """
+    Flatten an ES module and its relative imports into a single module.
+
+    Dependencies are emitted once each, in dependency order, as closures returning their
+    exports; the entry module stays at top level and keeps its own exports.
+
+    Args:
+        static_folder (str): Root directory the module paths are relative to.
+        entry (str): Path of the entry module relative to ``static_folder``.
+
+    Raises:
+        AssetBuildError: On import cycles or unsupported import/export syntax.
+
+    Returns:
+        str: Source of the bundled module.
+    """
+    emitted: List[str] = []
+    chunks: List[str] = []
+    visiting = set()
+
+    def resolve_imports(source: str, path: str) -> str:
+        def replace(m):
+            dep = posixpath.normpath(posixpath.join(posixpath.dirname(path), m.group('path')))
+            visit(dep)
+            bindings = []
+            if m.group('default'):
+                bindings.append(f"const {m.group('default')} = {_module_var(dep)}.default")
+            if m.group('named') is not None:
+                names = _split_names(m.group('named'))
+                if names:
+                    bindings.append(f"const {{ {', '.join(names)} }} = {_module_var(dep)}")
+            return '\n'.join(bindings)
+
+        code = _IMPORT_RE.sub(replace, source)
+        if re.search(r"^import\s.*['\"]\.{1,2}/", code, re.MULTILINE):
+            raise AssetBuildError(f"Unsupported import syntax in {path}")
+        return code
+
+    def visit(path: str) -> None:
+        if path in emitted:
+            return
+        if path in visiting:
+            raise AssetBuildError(f"Import cycle through {path}")
+        visiting.add(path)
+        with open(os.path.join(static_folder, path), encoding='utf-8') as f:
+            source = f.read()
+        code = resolve_imports(source, path)
+        visiting.discard(path)
+
+        if path == entry:
+            chunks.append(f"// {path}\n{code}")
+        else:
+            code, exported, default = _strip_exports(code, path)
+            members = exported + ([f"default: {default}"] if default else [])
+            chunks.append(
+                f"// {path}\nconst {_module_var(path)} = (() => {{\n{code}\n"
+                f"return {{ {', '.join(members)} }}\n}})()"
+            )
+        emitted.append(path)
+
+    visit(entry)
+    return '\n\n'.join(chunks) + '\n'
+
+
+def _build_asset(source: str, body: bytes) -> Asset:
+    root, ext = posixpath.splitext(posixpath.basename(source))
+    digest = hashlib.sha256(body).hexdigest()[:12]
+    asset = Asset(
+        source=source,
+        filename=f"{root}.{digest}{ext}",
+        content_type=CONTENT_TYPES.get(ext, 'application/octet-stream'),
+    )
+    asset.variants['identity'] = body
+    asset.variants['gzip'] = gzip.compress(body, compresslevel=9, mtime=0)
+    if brotli is not None:
+        asset.variants['br'] = brotli.compress(body)
+    return asset
+
+
+def build_assets(static_folder: str, entries: List[str], stylesheets: List[str]) -> AssetManifest:
+    """
+    Bundle, hash and precompress the given entry modules and stylesheets.
+
+    Args:
+        static_folder (str): The application's static folder.
+        entries (List[str]): ES module entry points relative to ``static_folder``.
+        stylesheets (List[str]): Stylesheets relative to ``static_folder``.
+
+    Raises:
+        AssetBuildError: If a module cannot be bundled.
+        FileNotFoundError: If a listed file does not exist.
+
+    Returns:
+        AssetManifest: The built assets.
+    """
+    manifest = AssetManifest()
+    for entry in entries:
+        body = bundle_module(static_folder, entry).encode('utf-8')
+        manifest.add(_build_asset(entry, body))
+    for stylesheet in stylesheets:
+        with open(os.path.join(static_folder, stylesheet), 'rb') as f:
+            manifest.add(_build_asset(stylesheet, f.read()))
+    for asset in manifest.by_source.values():
+        logger.info(f"Built asset {asset.source} -> {asset.filename} "
+                    f"({', '.join(f'{k}: {len(v)}B' for k, v in asset.variants.items())})")
+    return manifest
@@ -0,0 +1,149 @@
+"""
+This module provides a spatial index over workshop locations for nearest-workshop searches.
+
+Workshops are stored in a KD-tree over points on the unit sphere. The straight-line (chord)
+distance between two such points grows monotonically with their great-circle distance, so
+nearest-neighbour and radius queries in 3D give exact results on the globe without the
+distortions of a latitude/longitude grid.
+
+Module Contents:
+    - haversine_km: Great-circle distance between two coordinates.
+    - WorkshopIndex: KD-tree of services with coordinates, supporting k-nearest and radius queries.
+"""
+
+import heapq
+import math
+from typing import List, Optional, Sequence, Tuple
+
+from .service_loader import Service
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def _to_xyz(latitude: float, longitude: float) -> Tuple[float, float, float]:
+    lat, lon = math.radians(latitude), math.radians(longitude)
+    return (math.cos(lat) * math.cos(lon), math.cos(lat) * math.sin(lon), math.sin(lat))
+
+
+def _chord_to_km(chord: float) -> float:
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+
+def _km_to_chord(km: float) -> float:
+    return 2 * math.sin(min(math.pi, km / EARTH_RADIUS_KM) / 2)
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Calculate the great-circle distance between two points.
+
+    Args:
+        lat1 (float): Latitude of the first point in degrees.
+        lon1 (float): Longitude of the first point in degrees.
+        lat2 (float): Latitude of the second point in degrees.
+        lon2 (float): Longitude of the second point in degrees.
+
+    Returns:
+        float: Distance in kilometres.
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class _Node:
+    __slots__ = ('point', 'service', 'axis', 'left', 'right')
+
+    def __init__(self, point, service, axis, left, right):
+        self.point = point
+        self.service = service
+        self.axis = axis
+        self.left = left
+        self.right = right
+
+
+class WorkshopIndex:
+    """
+    Spatial index of the services that have coordinates.
+
+    The tree is built once from the loaded services; services without coordinates are left out
+    of geographic queries.
+
+    Attributes:
+        size (int): Number of indexed services.
+    """
+
+    def __init__(self, services: Sequence[Service]):
+        entries = [(_to_xyz(s.latitude, s.longitude), s) for s in services
+                   if s.latitude is not None and s.longitude is not None]
+        self.size = len(entries)
+        self._root = self._build(entries, 0)
+
+    def _build(self, entries, depth) -> Optional[_Node]:
+        if not entries:
+            return None
+        axis = depth % 3
+        entries.sort(key=lambda entry: entry[0][axis])
+        median = len(entries) // 2
+        point, service = entries[median]
+        return _Node(point, service, axis,
+                     self._build(entries[:median], depth + 1),
+                     self._build(entries[median + 1:], depth + 1))
+
+    def nearest(self, latitude: float, longitude: float, k: int = 1,
+                radius_km: Optional[float] = None) -> List[Tuple[Service, float]]:
+        """
+        Find the k services closest to a position.
+
+        Args:
+            latitude (float): Latitude of the position in degrees.
+            longitude (float): Longitude of the position in degrees.
+            k (int): Maximum number of services to return.
+            radius_km (Optional[float]): If given, ignore services farther away than this.
+
+        Returns:
+            List[Tuple[Service, float]]: (service, distance in km) pairs, closest first.
+        """
+        if k < 1:
+            return []
+        target = _to_xyz(latitude, longitude)
+        limit = _km_to_chord(radius_km) ** 2 if radius_km is not None else math.inf
+        heap: List[Tuple[float, int, Service]] = []  # max-heap of (-squared chord, tiebreak, service)
+
+        def visit(node: Optional[_Node]) -> None:
+            if node is None:
+                return
+            dist = sum((a - b) ** 2 for a, b in zip(node.point, target))
+            if dist <= limit:
+                entry = (-dist, id(node), node.service)
+                if len(heap) < k:
+                    heapq.heappush(heap, entry)
+                elif dist < -heap[0][0]:
+                    heapq.heapreplace(heap, entry)
+
+            diff = target[node.axis] - node.point[node.axis]
+            near, far = (node.left, node.right) if diff < 0 else (node.right, node.left)
+            visit(near)
+            bound = -heap[0][0] if len(heap) == k else limit
+            if diff * diff <= bound:
+                visit(far)
+
+        visit(self._root)
+        results = sorted(((-neg, service) for neg, _, service in heap), key=lambda r: r[0])
+        return [(service, _chord_to_km(math.sqrt(dist))) for dist, service in results]
+
+    def within(self, latitude: float, longitude: float, radius_km: float) -> List[Tuple[Service, float]]:
+        """
+        Find every service within a radius of a position.
+
+        Args:
+            latitude (float): Latitude of the position in degrees.
+            longitude (float): Longitude of the position in degrees.
+            radius_km (float): Search radius in kilometres.
+
+        Returns:
+            List[Tuple[Service, float]]: (service, distance in km) pairs, closest first.
+        """
+        return self.nearest(latitude, longitude, k=max(self.size, 1), radius_km=radius_km)
@@ -0,0 +1,197 @@
+"""
+This module provides request hedging for idempotent upstream calls.
+
+A workshop that is occasionally many times slower than usual drags every availability request
+down with it. When hedging is enabled, a call that has not finished within the workshop's
+observed high-percentile latency is duplicated, and whichever attempt answers first wins. A
+budget keeps the extra upstream load to a small fraction of the primary traffic.
+
+Module Contents:
+    - LatencyTracker: Rolling per-service latency samples and percentiles.
+    - HedgeBudget: Limits hedges to a fraction of primary calls.
+    - Hedger: Runs a call with an optional delayed second attempt.
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, TimeoutError, wait
+from typing import Any, Callable, Deque, Dict, Optional
+
+
+class LatencyTracker:
+    """
+    Keeps the most recent latency samples for each service.
+
+    Attributes:
+        window (int): Number of samples kept per service.
+        min_samples (int): Samples required before a percentile is reported.
+    """
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.window = window
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def record(self, name: str, seconds: float) -> None:
+        """Add a latency sample for the given service."""
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def percentile(self, name: str, q: float) -> Optional[float]:
+        """
+        Return the nearest-rank percentile of the recorded latencies.
+
+        Args:
+            name (str): The service name.
+            q (float): The percentile, between 0 and 100.
+
+        Returns:
+            Optional[float]: Latency in seconds, or None if there are too few samples.
+        """
+        with self._lock:
+            samples = sorted(self._samples.get(name, ()))
+        if len(samples) < max(1, self.min_samples):
+            return None
+        rank = max(1, math.ceil(q / 100 * len(samples)))
+        return samples[rank - 1]
+
+    def clear(self) -> None:
+        """Drop all samples."""
+        with self._lock:
+            self._samples.clear()
+
+
+class HedgeBudget:
+    """
+    Token budget for hedged calls.
+
+    Every primary call deposits ``ratio`` tokens and every hedge spends one, so over time at
+    most ``ratio`` extra calls are made per primary call.
+
+    Attributes:
+        ratio (float): Tokens earned per primary call.
+        max_tokens (float): Cap on saved-up tokens, bounding hedge bursts.
+    """
+
+    def __init__(self, ratio: float = 0.05, max_tokens: float = 10):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._lock = threading.Lock()
+        self._tokens = 0.0
+
+    def deposit(self) -> None:
+        """Credit the budget for one primary call."""
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        """Spend one token on a hedge, if available."""
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+class Hedger:
+    """
+    Runs idempotent calls with a delayed hedge.
+
+    The hedge delay is the service's ``percentile`` latency from the tracker, counted from the
+    moment the first attempt starts running. Until enough samples have been collected, or when
+    the budget is empty, calls run without a hedge.
+
+    Each service gets its own pool of ``max_workers`` threads, so a workshop that hangs can
+    only tie up its own workers and calls to healthy workshops never queue behind it. The
+    calls themselves must be bounded (e.g. by an HTTP timeout) for losing attempts to end.
+
+    Attributes:
+        tracker (LatencyTracker): Source of per-service latency percentiles.
+        budget (HedgeBudget): Limits how many hedges are sent.
+        percentile (float): Latency percentile after which a hedge is sent.
+        min_delay (float): Lower bound for the hedge delay in seconds.
+        max_workers (int): Threads per service for primary and hedged attempts.
+    """
+
+    def __init__(self, tracker: LatencyTracker, budget: HedgeBudget,
+                 percentile: float = 95, min_delay: float = 0.05, max_workers: int = 16):
+        self.tracker = tracker
+        self.budget = budget
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_workers = max_workers
+        self.hedges_sent = 0
+        self._lock = threading.Lock()
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+
+    def _executor(self, name: str) -> ThreadPoolExecutor:
+        with self._lock:
+            executor = self._executors.get(name)
+            if executor is None:
+                executor = self._executors[name] = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix=f'hedge-{name}'
+                )
+            return executor
+
+    def call(self, name: str, fn: Callable[..., Any], *args: Any,
+             timeout: Optional[float] = None) -> Any:
+        """
+        Call ``fn(*args)``, sending a second attempt if the first is slower than usual.
+
+        Args:
+            name (str): The service the call goes to, used for latency lookups.
+            fn (Callable[..., Any]): The idempotent call to make.
+            *args (Any): Arguments passed to ``fn``.
+            timeout (Optional[float]): Seconds to wait for an answer once hedging applies;
+                None waits for the attempts to finish.
+
+        Returns:
+            Any: The result of the first attempt to succeed.
+
+        Raises:
+            TimeoutError: If no attempt answered within ``timeout`` seconds.
+            Exception: The first attempt's exception, if every attempt failed.
+        """
+        self.budget.deposit()
+        delay = self.tracker.percentile(name, self.percentile)
+        if delay is None:
+            return fn(*args)
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        def remaining() -> Optional[float]:
+            return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+        executor = self._executor(name)
+        started = threading.Event()
+
+        def primary_attempt() -> Any:
+            started.set()
+            return fn(*args)
+
+        primary = executor.submit(primary_attempt)
+        # Time spent waiting for a free worker is not upstream latency and must not trigger a hedge
+        if not started.wait(remaining()):
+            primary.cancel()
+            raise TimeoutError(f"No worker became free for {name} within {timeout}s")
+        hedge_after = max(delay, self.min_delay)
+        done, _ = wait([primary], timeout=hedge_after if deadline is None else min(hedge_after, remaining()))
+        if done or not self.budget.withdraw():
+            return primary.result(remaining())
+
+        self.hedges_sent += 1
+        pending = {primary, executor.submit(fn, *args)}
+        while pending:
+            done, pending = wait(pending, timeout=remaining(), return_when=FIRST_COMPLETED)
+            if not done:
+                raise TimeoutError(f"No answer from {name} within {timeout}s")
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+        return primary.result()
@@ -0,0 +1,225 @@
+"""
+This module provides opt-in profiling for the request hot path.
+
+Per-request phase timings show where a slow request spent its time (upstream waits, parsing,
+sorting, serialisation) and are reported through the standard ``Server-Timing`` header. A
+profile window additionally captures sampled call stacks or an allocation snapshot across a
+number of requests and exports them in the folded-stack format understood by flamegraph tools
+(``flamegraph.pl``, speedscope, inferno).
+
+When profiling is not requested, callers use ``NULL_PHASE`` and pay only for a no-op context
+manager.
+
+Module Contents:
+    - NULL_PHASE: Reusable no-op context manager for unprofiled requests.
+    - PhaseTimer: Accumulates named phase durations for one request.
+    - ProfileWindow: Captures a sampled CPU profile or allocation snapshot over N requests,
+      bounded by a wall-clock limit.
+"""
+
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, Iterator, Optional, Set
+
+NULL_PHASE = nullcontext()
+
+PROFILE_MODES = ('cpu', 'memory')
+
+
+def _metric_name(name: str) -> str:
+    """Turn a phase name into a valid Server-Timing metric token."""
+    return re.sub(r'[^A-Za-z0-9_.-]+', '-', name).strip('-').lower() or 'phase'
+
+
+class PhaseTimer:
+    """
+    Records how long a request spends in each named phase.
+
+    Re-entering a phase adds to its total, so per-service phases inside a loop are summed.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        self._clock = clock
+        self.started = clock()
+        self.phases: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the enclosed block under the given phase name."""
+        start = self._clock()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + self._clock() - start
+
+    def total(self) -> float:
+        """Return seconds elapsed since the timer was created."""
+        return self._clock() - self.started
+
+    def server_timing(self) -> str:
+        """
+        Format the recorded phases as a ``Server-Timing`` header value.
+
+        Returns:
+            str: Comma-separated metrics with durations in milliseconds, ending with the total.
+        """
+        metrics = [f"{_metric_name(name)};dur={seconds * 1000:.2f}"
+                   for name, seconds in self.phases.items()]
+        metrics.append(f"total;dur={self.total() * 1000:.2f}")
+        return ', '.join(metrics)
+
+
+class ProfileWindow:
+    """
+    Profiles the next ``requests`` requests and keeps the result for export.
+
+    The window also finishes ``max_seconds`` after its first profiled request, or when
+    ``stop`` is called, so that a quiet worker does not keep tracing indefinitely.
+
+    In ``cpu`` mode a background thread samples the call stacks of the threads currently
+    serving profiled requests every ``interval`` seconds. In ``memory`` mode tracemalloc runs
+    for the duration of the window and a snapshot of live allocations is taken at the end.
+
+    Attributes:
+        mode (str): Either ``cpu`` or ``memory``.
+        requests (int): Number of requests the window covers.
+        interval (float): Sampling interval in seconds for ``cpu`` mode.
+        max_seconds (float): Wall-clock limit on the window once it has started.
+        phase_totals (Dict[str, float]): Phase durations summed across profiled requests.
+    """
+
+    def __init__(self, requests: int, mode: str = 'cpu', interval: float = 0.005,
+                 max_seconds: float = 300):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {mode}")
+        if requests < 1:
+            raise ValueError("Profile window must cover at least one request")
+        self.mode = mode
+        self.requests = requests
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.phase_totals: Dict[str, float] = {}
+        self._remaining = requests
+        self._lock = threading.Lock()
+        self._threads: Set[int] = set()
+        self._samples: Counter = Counter()
+        self._sampler: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._started = False
+        self._finishing = False
+        self._timer: Optional[threading.Timer] = None
+        self._started_tracemalloc = False
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        self.finished = threading.Event()
+
+    @property
+    def remaining(self) -> int:
+        """Number of requests still to be profiled."""
+        return self._remaining
+
+    def begin_request(self) -> bool:
+        """
+        Claim a place in the window for the current request.
+
+        Returns:
+            bool: True if the current request should be profiled.
+        """
+        with self._lock:
+            if self._remaining <= 0 or self._finishing:
+                return False
+            self._remaining -= 1
+            self._threads.add(threading.get_ident())
+            if not self._started:
+                self._start()
+            return True
+
+    def end_request(self, timer: Optional[PhaseTimer] = None) -> None:
+        """Release the current request's place and finish the window after the last one."""
+        with self._lock:
+            self._threads.discard(threading.get_ident())
+            if timer is not None:
+                for name, seconds in timer.phases.items():
+                    self.phase_totals[name] = self.phase_totals.get(name, 0.0) + seconds
+            if self._remaining > 0 or self._threads or self._finishing:
+                return
+            self._finishing = True
+        self._finish()
+
+    def stop(self) -> None:
+        """Finish the window now, keeping whatever has been captured so far."""
+        with self._lock:
+            if self._finishing:
+                return
+            self._finishing = True
+            self._remaining = 0
+        self._finish()
+
+    def _start(self) -> None:
+        self._started = True
+        self._timer = threading.Timer(self.max_seconds, self.stop)
+        self._timer.daemon = True
+        self._timer.start()
+        if self.mode == 'memory':
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(25)
+                self._started_tracemalloc = True
+        else:
+            self._sampler = threading.Thread(target=self._sample, name='profile-sampler', daemon=True)
+            self._sampler.start()
+
+    def _finish(self) -> None:
+        if self._timer is not None and self._timer is not threading.current_thread():
+            self._timer.cancel()
+        if self.mode == 'memory':
+            if tracemalloc.is_tracing():
+                self._snapshot = tracemalloc.take_snapshot()
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+        else:
+            self._stop.set()
+            if self._sampler is not None and self._sampler is not threading.current_thread():
+                self._sampler.join()
+        self.finished.set()
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                threads = set(self._threads)
+            frames = sys._current_frames()
+            for thread_id in threads:
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                self._samples[';'.join(reversed(stack))] += 1
+
+    def folded(self) -> str:
+        """
+        Export the captured profile in folded-stack format.
+
+        Each line holds a semicolon-separated stack, root first, followed by its weight: the
+        number of samples in ``cpu`` mode, or live bytes allocated there in ``memory`` mode.
+
+        Returns:
+            str: The folded stacks, or an empty string if the window has not finished.
+        """
+        if not self.finished.is_set():
+            return ''
+        if self.mode == 'memory':
+            if self._snapshot is None:
+                return ''
+            lines = []
+            for stat in self._snapshot.statistics('traceback'):
+                frames = [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback]
+                lines.append(f"{';'.join(frames)} {stat.size}")
+            return '\n'.join(lines)
+        return '\n'.join(f"{stack} {count}" for stack, count in self._samples.most_common())
@@ -0,0 +1,148 @@
+"""
+This module provides in-process bookkeeping that keeps duplicate booking attempts away from
+the workshop APIs.
+
+Two users clicking the same slot, or one user double-clicking the confirm button, would
+otherwise each cost a full upstream booking call. The reservation table lets the first request
+hold a short lease on a slot so that competing requests can be refused locally, and the
+idempotency store replays the result of a completed booking to retries carrying the same key.
+
+Module Contents:
+    - SlotReservations: Lease table keyed by (location, timeslot id).
+    - IdempotencyStore: Stores booking results by client-supplied idempotency key.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class SlotReservations:
+    """
+    Tracks short-lived leases on time slots that are currently being booked.
+
+    A lease is acquired before the upstream booking call and either released when the call
+    fails or converted into a longer "booked" hold when it succeeds, so that the slot is not
+    offered to the workshop again until its own availability data catches up.
+
+    Attributes:
+        lease_seconds (float): How long an in-flight booking holds its slot.
+        booked_seconds (float): How long a confirmed booking keeps the slot blocked locally.
+    """
+
+    def __init__(self, lease_seconds: float = 30, booked_seconds: float = 300,
+                 clock: Callable[[], float] = time.monotonic):
+        self.lease_seconds = lease_seconds
+        self.booked_seconds = booked_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._leases: Dict[Tuple[str, str], Tuple[Hashable, float]] = {}
+
+    @staticmethod
+    def _key(location: str, timeslot_id: Any) -> Tuple[str, str]:
+        return (location, str(timeslot_id))
+
+    def _purge(self, now: float) -> None:
+        expired = [key for key, (_, expires) in self._leases.items() if expires <= now]
+        for key in expired:
+            del self._leases[key]
+
+    def acquire(self, location: str, timeslot_id: Any, owner: Hashable) -> bool:
+        """
+        Try to lease a slot for the given owner.
+
+        Args:
+            location (str): The service name the slot belongs to.
+            timeslot_id (Any): The workshop's id for the slot.
+            owner (Hashable): Token identifying the booking attempt.
+
+        Returns:
+            bool: True if the lease was granted; False if the slot is already held.
+        """
+        key = self._key(location, timeslot_id)
+        with self._lock:
+            now = self._clock()
+            self._purge(now)
+            if key in self._leases:
+                return False
+            self._leases[key] = (owner, now + self.lease_seconds)
+            return True
+
+    def release(self, location: str, timeslot_id: Any, owner: Hashable) -> None:
+        """Drop a lease, if it is still held by the given owner."""
+        key = self._key(location, timeslot_id)
+        with self._lock:
+            lease = self._leases.get(key)
+            if lease and lease[0] == owner:
+                del self._leases[key]
+
+    def mark_booked(self, location: str, timeslot_id: Any, owner: Hashable) -> None:
+        """Extend a held lease to the booked hold period after a successful booking."""
+        key = self._key(location, timeslot_id)
+        with self._lock:
+            self._leases[key] = (owner, self._clock() + self.booked_seconds)
+
+    def is_held(self, location: str, timeslot_id: Any) -> bool:
+        """Check whether a slot is currently leased or booked."""
+        key = self._key(location, timeslot_id)
+        with self._lock:
+            lease = self._leases.get(key)
+            return bool(lease) and lease[1] > self._clock()
+
+    def clear(self) -> None:
+        """Drop all leases."""
+        with self._lock:
+            self._leases.clear()
+
+
+class IdempotencyStore:
+    """
+    Remembers the response of completed bookings by idempotency key.
+
+    Each entry also records a fingerprint of the request it was created for, so that a key
+    reused for a different booking can be detected instead of silently replaying.
+
+    Attributes:
+        ttl_seconds (float): How long a stored result can be replayed.
+    """
+
+    def __init__(self, ttl_seconds: float = 24 * 60 * 60,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[Hashable, Any, float]] = {}
+
+    def get(self, key: str) -> Optional[Tuple[Hashable, Any]]:
+        """
+        Look up a stored result.
+
+        Args:
+            key (str): The client-supplied idempotency key.
+
+        Returns:
+            Optional[Tuple[Hashable, Any]]: The (fingerprint, result) pair, or None if unknown
+            or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[2] <= self._clock():
+                del self._entries[key]
+                return None
+            return entry[0], entry[1]
+
+    def put(self, key: str, fingerprint: Hashable, result: Any) -> None:
+        """Store the result of a completed booking under the given key."""
+        with self._lock:
+            now = self._clock()
+            expired = [k for k, (_, _, expires) in self._entries.items() if expires <= now]
+            for k in expired:
+                del self._entries[k]
+            self._entries[key] = (fingerprint, result, now + self.ttl_seconds)
+
+    def clear(self) -> None:
+        """Drop all stored results."""
+        with self._lock:
+            self._entries.clear()
@@ -7,6 +7,7 @@ objects, each representing an API service with its base URL, content type, and e
 Module Contents:
     - Service: A dataclass representing the service configuration.
     - _find_endpoint: Helper function for finding endpoints by HTTP method and keyword.
+    - _parse_coordinates: Helper function for reading workshop coordinates from service info.
     - load_services: Function to load and parse API documentation files.
 """
 
@@ -15,7 +16,7 @@ import os
 import yaml
 import logging
 from dataclasses import dataclass
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -35,6 +36,8 @@ class Service:
         booking_path (str): The endpoint path for booking a tire change time.
         address (str): The address of the service.
         vehicle_types (List[str]): The types of vehicles supported by the service.
+        latitude (Optional[float]): Latitude of the workshop in degrees, if known.
+        longitude (Optional[float]): Longitude of the workshop in degrees, if known.
     """
     name: str
     version: str
@@ -44,6 +47,8 @@ class Service:
     booking_path: str
     address: str
     vehicle_types: List[str]
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
 
 def _find_endpoint(paths: Dict, method: str, keyword: str) -> Optional[str]:
     """
@@ -79,6 +84,31 @@ def _load_service_info(services_dir: str) -> Dict:
     with open(info_path, 'r') as f:
         return yaml.safe_load(f)
 
+def _parse_coordinates(info: Dict, name: str) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Read workshop coordinates from a service_info.yaml entry.
+
+    Args:
+        info (Dict): The service's entry in service_info.yaml.
+        name (str): The service name, used in log messages.
+
+    Returns:
+        Tuple[Optional[float], Optional[float]]: (latitude, longitude), or (None, None) if the
+        entry has no valid coordinates.
+    """
+    if 'latitude' not in info and 'longitude' not in info:
+        return None, None
+    try:
+        latitude = float(info['latitude'])
+        longitude = float(info['longitude'])
+    except (KeyError, TypeError, ValueError):
+        logger.warning(f"Invalid coordinates for {name} in service_info.yaml")
+        return None, None
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        logger.warning(f"Coordinates out of range for {name} in service_info.yaml")
+        return None, None
+    return latitude, longitude
+
 def _validate_service_doc(doc: Dict, filename: str) -> bool:
     """Validate that the service documentation has all required fields."""
     required_fields = {
@@ -190,6 +220,7 @@ def load_services(services_dir: str) -> List[Service]:
                 logger.warning(f"No additional info found for {name} in service_info.yaml")
             address = info.get('address', 'Address not available')
             vehicle_types = info.get('vehicle_types', [])
+            latitude, longitude = _parse_coordinates(info, name)
 
             service = Service(
                 name=name,
@@ -199,7 +230,9 @@ def load_services(services_dir: str) -> List[Service]:
                 available_times_path=available_times_path,
                 booking_path=booking_path,
                 address=address,
-                vehicle_types=vehicle_types
+                vehicle_types=vehicle_types,
+                latitude=latitude,
+                longitude=longitude
             )
             services.append(service)
             logger.info(f"Successfully loaded service: {name} with base URL: {base_url}")
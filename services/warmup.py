@@ -0,0 +1,177 @@
+"""
+This module provides the warm-up phase a worker runs before it takes traffic.
+
+A freshly started worker has no DNS results, no pooled connections to the workshops and no
+availability data, so its first requests are slow. The warm-up resolves each workshop host and
+runs one availability fetch per service through the shared HTTP session, leaving connections
+open in the pool. The readiness state it maintains lets a load balancer hold traffic back until
+warm-up has finished or given up.
+
+Module Contents:
+    - WarmupState: Thread-safe progress and readiness of the warm-up.
+    - resolve_host: Resolves the host of a service's base URL.
+    - run_warmup: Warms up all services concurrently, bounded by a timeout.
+    - start_warmup: Runs run_warmup in a background thread.
+"""
+
+import logging
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from urllib.parse import urlsplit
+
+from .service_loader import Service
+
+logger = logging.getLogger(__name__)
+
+
+class WarmupState:
+    """
+    Tracks the warm-up of one worker.
+
+    Attributes:
+        status (str): One of PENDING, RUNNING, READY or TIMED_OUT.
+        services (Dict[str, str]): Per-service outcome: 'ok', 'empty' (the fetch returned no
+            times, which is also what a workshop answering with an error looks like),
+            'timed out' or 'failed: <error>'. Outcomes are final once warm-up has finished.
+    """
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    READY = 'ready'
+    TIMED_OUT = 'timed_out'
+
+    def __init__(self, status: str = PENDING):
+        self._lock = threading.Lock()
+        self.status = status
+        self.services: Dict[str, str] = {}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        """True once warm-up has finished or timed out."""
+        return self.status in (self.READY, self.TIMED_OUT)
+
+    def set_status(self, status: str) -> None:
+        with self._lock:
+            self.status = status
+            if status == self.RUNNING:
+                self.started_at = time.monotonic()
+            elif status in (self.READY, self.TIMED_OUT):
+                self.finished_at = time.monotonic()
+
+    def record(self, name: str, outcome: str) -> None:
+        """Record a service's outcome, unless warm-up has already finished."""
+        with self._lock:
+            if self.status == self.RUNNING:
+                self.services[name] = outcome
+
+    def finish(self, timed_out: Sequence[str]) -> None:
+        """
+        End warm-up, marking services that had not reported by now as timed out.
+
+        Args:
+            timed_out (Sequence[str]): Services still in progress when the timeout expired.
+        """
+        with self._lock:
+            for name in timed_out:
+                self.services.setdefault(name, 'timed out')
+            self.status = self.TIMED_OUT if timed_out else self.READY
+            self.finished_at = time.monotonic()
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the state as a JSON-serialisable dictionary."""
+        with self._lock:
+            duration = None
+            if self.started_at is not None:
+                duration = round((self.finished_at or time.monotonic()) - self.started_at, 3)
+            return {
+                'ready': self.ready,
+                'status': self.status,
+                'durationSeconds': duration,
+                'services': dict(self.services),
+            }
+
+
+def resolve_host(base_url: str) -> bool:
+    """
+    Resolve the host of a base URL so the first real request does not wait on DNS.
+
+    Args:
+        base_url (str): The service's base URL.
+
+    Returns:
+        bool: True if the host resolved; False if it did not or the URL has no host.
+    """
+    parts = urlsplit(base_url)
+    if not parts.hostname:
+        return False
+    try:
+        socket.getaddrinfo(parts.hostname, parts.port or (443 if parts.scheme == 'https' else 80),
+                           type=socket.SOCK_STREAM)
+        return True
+    except (socket.gaierror, UnicodeError):
+        return False
+
+
+def run_warmup(state: WarmupState, services: Sequence[Service], fetch: Callable[[Service], Any],
+               timeout: float, on_complete: Optional[Callable[[List[Any]], None]] = None) -> None:
+    """
+    Warm up all services concurrently.
+
+    For each service the host is resolved and ``fetch(service)`` is called once. The state
+    becomes READY when every service has been tried, or TIMED_OUT if that takes longer than
+    ``timeout`` seconds; services still in progress then finish in the background without
+    changing the recorded outcome.
+
+    Args:
+        state (WarmupState): State to update.
+        services (Sequence[Service]): Services to warm up.
+        fetch (Callable[[Service], Any]): Makes one availability request for a service.
+        timeout (float): Seconds to wait before reporting ready regardless.
+        on_complete (Optional[Callable[[List[Any]], None]]): Called with the results of the
+            fetches that finished in time.
+    """
+    state.set_status(WarmupState.RUNNING)
+
+    def warm(service: Service) -> Any:
+        if not resolve_host(service.base_url):
+            logger.warning(f"Warm-up could not resolve host for {service.name}")
+        try:
+            result = fetch(service)
+        except Exception as e:
+            state.record(service.name, f"failed: {e}")
+            raise
+        state.record(service.name, 'ok' if result else 'empty')
+        return result
+
+    executor = ThreadPoolExecutor(max_workers=max(1, len(services)), thread_name_prefix='warmup')
+    try:
+        futures = [executor.submit(warm, service) for service in services]
+        done, pending = wait(futures, timeout=timeout)
+    finally:
+        executor.shutdown(wait=False)
+
+    results = [f.result() for f in futures if f in done and f.exception() is None]
+    if on_complete is not None:
+        try:
+            on_complete(results)
+        except Exception as e:
+            logger.error(f"Warm-up completion handler failed: {e}")
+
+    state.finish([service.name for service, future in zip(services, futures) if future in pending])
+    logger.info(f"Warm-up {state.status} after {state.as_dict()['durationSeconds']}s")
+
+
+def start_warmup(state: WarmupState, services: Sequence[Service], fetch: Callable[[Service], Any],
+                 timeout: float, on_complete: Optional[Callable[[List[Any]], None]] = None) -> threading.Thread:
+    """Run ``run_warmup`` in a daemon thread and return the thread."""
+    thread = threading.Thread(
+        target=run_warmup, args=(state, services, fetch, timeout, on_complete),
+        name='warmup', daemon=True
+    )
+    thread.start()
+    return thread
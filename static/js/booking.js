@@ -1,9 +1,10 @@
 // Description: Main booking app script for the booking page.
 // Path: static/js/booking.js
-// Dependencies: dataHandler.js, utils.js
+// Dependencies: dataHandler.js, utils.js, virtualList.js
 
-import { fetchTimesData, updateLocationFilter } from './dataHandler.js'
-import { validateForm, getVehicleIcon, formatDateTime } from './utils.js'
+import { fetchTimesData, prepareTimes, updateLocationFilter } from './dataHandler.js'
+import { validateForm, getVehicleIcon, formatDateTime, createIdempotencyKey } from './utils.js'
+import { VirtualGrid } from './virtualList.js'
 
 const CONFIG = {
   FEEDBACK_DELAY: 5000,
@@ -19,6 +20,12 @@ const CONFIG = {
       minute: '2-digit'
     }
   },
+  VIRTUAL_LIST: {
+    ROW_HEIGHT: 260,       // minimum card height (.times-container grid-auto-rows) + gap
+    MIN_COLUMN_WIDTH: 300, // matches minmax() in .times-container, used before layout
+    GAP: 20,
+    OVERSCAN: 2
+  },
   VEHICLE_ICONS: {
     TRUCK: '🚚',
     SUV: '🚙',
@@ -41,6 +48,8 @@ class BookingApp {
   constructor() {
     this.allTimes = []
     this.uiElements = {}
+    this.timesGrid = null
+    this.emptyMessage = null
     this.env = (typeof process !== 'undefined' && process.env.NODE_ENV) ? process.env.NODE_ENV : 'development'
     this.apiHost = (this.env === 'test') ? 'http://localhost:5000' : ''
   }
@@ -53,9 +62,22 @@ class BookingApp {
   setupApp() {
     this.cacheElements()
     this.uiElements.bookingModal.classList.add('hidden')
+    this.setupTimesGrid()
     this.bindEvents()
   }
 
+  setupTimesGrid() {
+    const { ROW_HEIGHT, MIN_COLUMN_WIDTH, GAP, OVERSCAN } = CONFIG.VIRTUAL_LIST
+    this.timesGrid = new VirtualGrid(this.uiElements.timesContainer, {
+      rowHeight: ROW_HEIGHT,
+      minColumnWidth: MIN_COLUMN_WIDTH,
+      gap: GAP,
+      overscan: OVERSCAN,
+      createItem: () => this.createTimeCard(),
+      updateItem: (card, time) => this.updateTimeCard(card, time)
+    }).attach()
+  }
+
   cacheElements() {
     const getElement = (selector) => {
       const element = document.querySelector(selector)
@@ -110,11 +132,29 @@ class BookingApp {
     })
   }
 
+  // Slots embedded by the server let the page show availability before fetchTimes() returns
+  showInitialTimes() {
+    const element = document.getElementById('initial-times')
+    if (!element) return false
+
+    try {
+      const data = JSON.parse(element.textContent)
+      if (!Array.isArray(data) || data.length === 0) return false
+      this.allTimes = prepareTimes(data)
+      updateLocationFilter(this.uiElements.locationSelect, data)
+      this.filterTimes()
+      return true
+    } catch (error) {
+      console.error('Invalid initial times:', error)
+      return false
+    }
+  }
+
   async fetchTimes() {
     this.showLoading(true)
     try {
       const data = await fetchTimesData(this.apiHost)
-      this.allTimes = data
+      this.allTimes = prepareTimes(data)
       updateLocationFilter(this.uiElements.locationSelect, data)
       this.filterTimes()
     } catch (error) {
@@ -159,8 +199,9 @@ class BookingApp {
     
     const vehicleType = vehicleTypeSelect.value
     const location = locationSelect.value
-    const dateRange = dateRangeSelect.value
+    const { from, until } = this.getDateRangeBounds(dateRangeSelect.value)
     
+    // dayStart is pre-computed by prepareTimes(), so no dates are parsed here
     let filteredTimes = this.allTimes.filter(time => {
       if (vehicleType !== 'all' && !time.vehicleTypes.includes(vehicleType)) {
         return false
@@ -168,76 +209,110 @@ class BookingApp {
       if (location !== 'all' && time.location !== location) {
         return false
       }
-      const timeDate = new Date(time.time)
-      if (!this.isDateInRange(timeDate, dateRange)) {
-        return false
-      }
-      return true
+      return time.dayStart >= from && time.dayStart <= until
     })
     
     this.displayTimes(filteredTimes)
   }
 
-  isDateInRange(date, range) {
+  getDateRangeBounds(range) {
     const today = new Date()
     today.setHours(0, 0, 0, 0)
-
-    const dateDay = new Date(date)
-    dateDay.setHours(0, 0, 0, 0)
+    const start = today.getTime()
 
     switch (range) {
       case 'today':
-        return dateDay.getTime() === today.getTime()
+        return { from: start, until: start }
       case 'tomorrow':
-        return dateDay.getTime() === today.getTime() + millisecondsPerDay
+        return { from: start + millisecondsPerDay, until: start + millisecondsPerDay }
       case 'week':
-        return dateDay.getTime() >= today.getTime() && dateDay.getTime() <= today.getTime() + millisecondsPerWeek
+        return { from: start, until: start + millisecondsPerWeek }
       case 'all':
       default:
-        return true
+        return { from: -Infinity, until: Infinity }
     }
   }
 
+  isDateInRange(date, range) {
+    const dateDay = new Date(date)
+    dateDay.setHours(0, 0, 0, 0)
+
+    const { from, until } = this.getDateRangeBounds(range)
+    return dateDay.getTime() >= from && dateDay.getTime() <= until
+  }
+
   displayTimes(times) {
     const container = this.uiElements.timesContainer
-    container.innerHTML = ''
+
+    if (!this.timesGrid.items.length && !this.emptyMessage) {
+      // Drop any server-side placeholder markup before the grid takes over
+      container.innerHTML = ''
+    }
+    if (this.emptyMessage) {
+      this.emptyMessage.remove()
+      this.emptyMessage = null
+    }
     
     if (times.length === 0) {
-      const noTimesMessage = document.createElement('p')
-      noTimesMessage.textContent = 'No available times match your filters. Please try different criteria.'
-      container.appendChild(noTimesMessage)
+      this.timesGrid.clear()
+      this.emptyMessage = document.createElement('p')
+      this.emptyMessage.textContent = 'No available times match your filters. Please try different criteria.'
+      container.appendChild(this.emptyMessage)
       return
     }
     
-    const fragment = document.createDocumentFragment()
-    
-    times.forEach(time => {
-      const timeDate = new Date(time.time)
-      const formattedDate = formatDateTime(timeDate, CONFIG.DATE_FORMAT.full)
-      const formattedTime = formatDateTime(timeDate, CONFIG.DATE_FORMAT.time)
-      
-      const vehicleIcon = getVehicleIcon(time.vehicleTypes, CONFIG.VEHICLE_ICONS)
-      const vehicleTypesText = time.vehicleTypes.join(', ')
-      
-      const timeCard = document.createElement('div')
-      timeCard.className = 'time-card'
-      timeCard.dataset.id = time.id
-      timeCard.innerHTML = `
-        <h3>${vehicleIcon} ${formattedDate}</h3>
-        <p>Time: ${formattedTime}</p>
-        <p>Vehicle Types: ${vehicleTypesText}</p>
-        <p>Location: ${time.location} <span class="location-badge">${time.location.substring(0, 3).toUpperCase()}</span></p>
-        <button class="book-button" data-id="${time.id}" data-time="${time.time}" data-location="${time.location}" data-vehicle-types="${time.vehicleTypes.join(',')}">Book This Slot</button>
-      `
-      
-      fragment.appendChild(timeCard)
-    })
-    
-    container.appendChild(fragment)
+    this.timesGrid.setItems(times)
+  }
+
+  createTimeCard() {
+    const card = document.createElement('div')
+    card.className = 'time-card'
+
+    const heading = document.createElement('h3')
+    const timeLine = document.createElement('p')
+    const vehicleLine = document.createElement('p')
+    const locationLine = document.createElement('p')
+    const locationText = document.createTextNode('')
+    const badge = document.createElement('span')
+    badge.className = 'location-badge'
+    locationLine.append(locationText, badge)
+
+    const button = document.createElement('button')
+    button.className = 'book-button'
+    button.textContent = 'Book This Slot'
+
+    card.append(heading, timeLine, vehicleLine, locationLine, button)
+    card.parts = { heading, timeLine, vehicleLine, locationText, badge, button }
+    return card
+  }
+
+  updateTimeCard(card, time) {
+    // Formatting is done once per slot and kept for later scroll passes
+    if (time.formattedDate === undefined) {
+      time.formattedDate = formatDateTime(time.date, CONFIG.DATE_FORMAT.full)
+      time.formattedTime = formatDateTime(time.date, CONFIG.DATE_FORMAT.time)
+    }
+
+    const { heading, timeLine, vehicleLine, locationText, badge, button } = card.parts
+    const vehicleIcon = getVehicleIcon(time.vehicleTypes, CONFIG.VEHICLE_ICONS)
+
+    card.dataset.id = time.id
+    heading.textContent = `${vehicleIcon} ${time.formattedDate}`
+    timeLine.textContent = `Time: ${time.formattedTime}`
+    vehicleLine.textContent = `Vehicle Types: ${time.vehicleTypes.join(', ')}`
+    locationText.textContent = `Location: ${time.location} `
+    badge.textContent = time.location.substring(0, 3).toUpperCase()
+
+    button.dataset.id = time.id
+    button.dataset.time = time.time
+    button.dataset.location = time.location
+    button.dataset.vehicleTypes = time.vehicleTypes.join(',')
   }
 
   async submitBooking(event) {
     event.preventDefault()
+    // A second click while the first submit is pending must not start another booking
+    if (this.bookingInFlight) return false
 
     const formElements = this.uiElements.bookingForm.elements
     const getValue = (name) => formElements[name].value.trim() || formElements[`booking-${name}`].value.trim()
@@ -258,11 +333,18 @@ class BookingApp {
       return false
     }
 
+    if (!this.bookingKey) {
+      this.bookingKey = createIdempotencyKey()
+    }
+
+    this.bookingInFlight = true
     try {
       const response = await fetch('/api/book', {
         method: 'POST',
         headers: {
-          'Content-Type': 'application/json; charset=utf-8'
+          'Content-Type': 'application/json; charset=utf-8',
+          // Same key for every submit of this modal, so a retry replays a completed booking
+          'Idempotency-Key': this.bookingKey
         },
         body: JSON.stringify(bookingData)
       })
@@ -298,11 +380,14 @@ class BookingApp {
     } catch (error) {
       this.showMessage('error', error.message)
       return false
+    } finally {
+      this.bookingInFlight = false
     }
   }
 
   closeModal() {
     const { bookingModal, bookingForm } = this.uiElements
+    this.bookingKey = null
     bookingModal.classList.add('hidden')
     bookingModal.classList.remove('visible')
     bookingForm.reset()
@@ -317,6 +402,7 @@ class BookingApp {
       vehicleTypes: button.dataset.vehicleTypes.split(',')
     }
 
+    this.bookingKey = createIdempotencyKey()
     this.uiElements.timeslotIdInput.value = timeslot.id
     this.uiElements.locationIdInput.value = timeslot.location
     this.uiElements.appointmentDetailsElement.textContent = 
@@ -350,6 +436,7 @@ class BookingApp {
 if (typeof process === 'undefined' || process.env.NODE_ENV !== 'test') {
   document.addEventListener('DOMContentLoaded', () => {
     const app = new BookingApp().init()
+    app.showInitialTimes()
     app.fetchTimes()
     setInterval(() => app.fetchTimes(), 60000)
   })
@@ -10,6 +10,16 @@ export async function fetchTimesData(apiHost) {
   return await response.json()
 }
 
+// Parse each slot's date once per fetch so filtering and rendering never re-parse it
+export function prepareTimes(times) {
+  return times.map(time => {
+    const date = new Date(time.time)
+    const day = new Date(date)
+    day.setHours(0, 0, 0, 0)
+    return { ...time, date, dayStart: day.getTime() }
+  })
+}
+
 export function updateLocationFilter(locationSelect, times) {
   while (locationSelect.options.length > 1) {
     locationSelect.remove(1)
@@ -63,4 +63,49 @@ describe('Booking Flow Integration Tests', () => {
     expect(bookingApp.uiElements.errorMessage.textContent)
       .toContain('no longer available')
   })
+
+  test('sends one idempotency key per modal and ignores a second click', async () => {
+    await bookingApp.fetchTimes()
+    const button = document.createElement('button')
+    Object.assign(button.dataset, {
+      id: mockTimeSlot.id,
+      time: mockTimeSlot.time,
+      location: mockTimeSlot.location,
+      vehicleTypes: mockTimeSlot.vehicleTypes.join(',')
+    })
+    bookingApp.openBookingModal({ target: button })
+
+    const form = bookingApp.uiElements.bookingForm
+    form.querySelector('#booking-name').value = 'John Doe'
+    form.querySelector('#booking-email').value = 'john@example.com'
+    form.querySelector('#booking-phone').value = '+37212345678'
+    form.querySelector('#booking-vehicle').value = 'Toyota Corolla'
+    form.querySelector('#booking-service-type').value = 'Regular'
+
+    let respond
+    global.fetch.mockImplementationOnce(() => new Promise(resolve => { respond = resolve }))
+    const first = bookingApp.submitBooking(new Event('submit'))
+    // Double click while the first request is pending
+    expect(await bookingApp.submitBooking(new Event('submit'))).toBe(false)
+    expect(global.fetch).toHaveBeenCalledTimes(2) // initial fetchTimes + one booking
+
+    const [, options] = global.fetch.mock.calls[1]
+    const key = options.headers['Idempotency-Key']
+    expect(key).toBeTruthy()
+
+    respond({ ok: false, status: 500, json: () => Promise.resolve({ error: 'Failed to process booking' }) })
+    expect(await first).toBe(false)
+
+    // Retrying from the same modal reuses the key
+    global.fetch.mockImplementationOnce(() =>
+      Promise.resolve({ ok: false, status: 500, json: () => Promise.resolve({ error: 'Failed' }) })
+    )
+    await bookingApp.submitBooking(new Event('submit'))
+    expect(global.fetch.mock.calls[2][1].headers['Idempotency-Key']).toBe(key)
+
+    // A new modal gets a new key
+    bookingApp.closeModal()
+    bookingApp.openBookingModal({ target: button })
+    expect(bookingApp.bookingKey).not.toBe(key)
+  })
 })
@@ -39,6 +39,31 @@ describe('BookingApp Initialization and Utility Methods', () => {
     })
   })
 
+  describe('Initial times', () => {
+    test('showInitialTimes should render slots embedded in the page', () => {
+      const slotTime = new Date()
+      slotTime.setHours(12, 0, 0, 0)
+      const script = document.createElement('script')
+      script.type = 'application/json'
+      script.id = 'initial-times'
+      script.textContent = JSON.stringify([
+        { id: '42', time: slotTime.toISOString(), location: 'London', vehicleTypes: ['Car'] }
+      ])
+      document.body.appendChild(script)
+
+      expect(bookingApp.showInitialTimes()).toBe(true)
+      expect(bookingApp.allTimes.length).toBe(1)
+      const cards = bookingApp.uiElements.timesContainer.querySelectorAll('.time-card')
+      expect(cards.length).toBe(1)
+      expect(cards[0].dataset.id).toBe('42')
+    })
+
+    test('showInitialTimes should do nothing without embedded slots', () => {
+      expect(bookingApp.showInitialTimes()).toBe(false)
+      expect(bookingApp.allTimes).toEqual([])
+    })
+  })
+
   describe('Utility Methods', () => {
     test('showLoading should toggle the loading element visibility', () => {
       bookingApp.showLoading(true)
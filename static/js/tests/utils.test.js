@@ -1,4 +1,4 @@
-import { validateForm, getVehicleIcon, formatDateTime } from '../utils.js'
+import { validateForm, getVehicleIcon, formatDateTime, createIdempotencyKey } from '../utils.js'
 
 describe('Utility Functions', () => {
   describe('validateForm', () => {
@@ -109,5 +109,12 @@ describe('Utility Functions', () => {
       expect(result1).toBe('car')
       expect(result2).toBe('car')
     })
-  })  
+  })
+
+  describe('createIdempotencyKey', () => {
+    test('should create distinct keys', () => {
+      const keys = new Set(Array.from({ length: 100 }, () => createIdempotencyKey()))
+      expect(keys.size).toBe(100)
+    })
+  })
 })
@@ -0,0 +1,158 @@
+// Description: Performance checks for windowed rendering that run on Node's built-in test
+// runner, without jsdom: `npm run test:perf` (or `node --test static/js/tests/virtualList.perf.mjs`)
+// Path: static/js/tests/virtualList.perf.mjs
+
+import { test, beforeEach } from 'node:test'
+import assert from 'node:assert/strict'
+
+// Just enough of the DOM for VirtualGrid: nodes with children, styles and layout metrics
+class FakeNode {
+  constructor () {
+    this.children = []
+    this.parentNode = null
+    this.style = {}
+    this.scrollHeight = 0
+    this.offsetHeight = 0
+    this.clientHeight = 0
+  }
+
+  appendChild (node) {
+    if (node.isFragment) {
+      node.children.splice(0).forEach(child => this.appendChild(child))
+      return node
+    }
+    node.remove()
+    node.parentNode = this
+    this.children.push(node)
+    return node
+  }
+
+  remove () {
+    if (!this.parentNode) return
+    const siblings = this.parentNode.children
+    siblings.splice(siblings.indexOf(this), 1)
+    this.parentNode = null
+  }
+}
+
+let gridTemplateColumns = ''
+globalThis.window = {
+  innerHeight: 900,
+  addEventListener () {},
+  removeEventListener () {},
+  getComputedStyle: () => ({ gridTemplateColumns })
+}
+globalThis.document = {
+  documentElement: { clientHeight: 900 },
+  createDocumentFragment: () => Object.assign(new FakeNode(), { isFragment: true })
+}
+
+const { VirtualGrid } = await import('../virtualList.js')
+const { prepareTimes } = await import('../dataHandler.js')
+
+const SLOT_COUNT = 50000
+const ROW_HEIGHT = 260
+
+const buildSlots = (count) => {
+  const start = new Date()
+  start.setHours(8, 0, 0, 0)
+  const locations = ['London', 'Manchester', 'Leeds', 'Bristol']
+  return Array.from({ length: count }, (_, i) => ({
+    id: String(i),
+    time: new Date(start.getTime() + (i % 600) * 60 * 1000).toISOString(),
+    location: locations[i % locations.length],
+    vehicleTypes: i % 2 ? ['Car', 'Truck'] : ['Car']
+  }))
+}
+
+const slots = prepareTimes(buildSlots(SLOT_COUNT))
+let container, grid, created, bound
+
+beforeEach(() => {
+  gridTemplateColumns = '310px 310px 310px'
+  created = 0
+  bound = 0
+  container = new FakeNode()
+  container.clientWidth = 960
+  container.getBoundingClientRect = () => ({ top: 0 })
+  grid = new VirtualGrid(container, {
+    rowHeight: ROW_HEIGHT,
+    minColumnWidth: 300,
+    gap: 20,
+    overscan: 2,
+    createItem: () => { created++; return new FakeNode() },
+    updateItem: (node, item) => { bound++; node.item = item }
+  })
+})
+
+const scrollTo = (top) => {
+  container.getBoundingClientRect = () => ({ top: -top })
+  grid.update()
+}
+
+test('renders only the visible window of 50k slots', () => {
+  const started = performance.now()
+  grid.setItems(slots)
+  const duration = performance.now() - started
+
+  const rendered = grid.range.end - grid.range.start
+  assert.equal(container.children.length, rendered)
+  assert.ok(rendered > 0 && rendered < 50, `rendered ${rendered} cards`)
+  const totalRows = Math.ceil(SLOT_COUNT / 3)
+  assert.equal(container.style.paddingBottom, `${(totalRows - rendered / 3) * ROW_HEIGHT}px`)
+  assert.ok(duration < 50, `initial render took ${duration.toFixed(1)}ms`)
+})
+
+test('scrolling through 50k slots reuses a fixed pool of nodes', () => {
+  grid.setItems(slots)
+  // Away from the top the window also holds the overscan rows above it
+  scrollTo(10 * ROW_HEIGHT)
+  const poolSize = created
+  assert.ok(poolSize < 50)
+  const totalHeight = Math.ceil(SLOT_COUNT / 3) * ROW_HEIGHT
+
+  const started = performance.now()
+  for (let top = 0; top < totalHeight; top += ROW_HEIGHT / 2) {
+    scrollTo(top)
+  }
+  const duration = performance.now() - started
+
+  assert.equal(created, poolSize)
+  assert.equal(grid.range.end, SLOT_COUNT)
+  assert.ok(duration < 2000, `${Math.ceil(totalHeight / (ROW_HEIGHT / 2))} scroll updates took ${duration.toFixed(1)}ms`)
+})
+
+test('filter changes over 50k slots re-render only the window', () => {
+  grid.setItems(slots)
+  const started = performance.now()
+  for (let i = 0; i < 10; i++) {
+    const vehicleType = i % 2 ? 'Truck' : 'Car'
+    grid.setItems(slots.filter(time => time.vehicleTypes.includes(vehicleType)))
+  }
+  const duration = performance.now() - started
+
+  assert.ok(container.children.length < 50)
+  assert.ok(bound < 50 * 11, `bound ${bound} cards`)
+  assert.ok(duration < 500, `10 filter passes took ${duration.toFixed(1)}ms`)
+})
+
+test('column count follows the laid-out grid, not the width estimate', () => {
+  gridTemplateColumns = '700px' // narrow-screen media query: one column at 700px
+  container.clientWidth = 700
+  grid.setItems(slots)
+  assert.equal(grid.getColumnCount(), 1)
+  assert.equal(container.style.paddingBottom, `${(SLOT_COUNT - container.children.length) * ROW_HEIGHT}px`)
+
+  gridTemplateColumns = 'repeat(auto-fill, minmax(300px, 1fr))' // not laid out yet
+  assert.equal(grid.getColumnCount(), 2)
+})
+
+test('rows grow to fit wrapped card content and stay stable', () => {
+  grid.setItems(slots)
+  Object.assign(container.children[0], { scrollHeight: 300, offsetHeight: 242, clientHeight: 240 })
+  grid.update()
+  assert.equal(grid.rowHeight, 322)
+  assert.equal(container.style.gridAutoRows, '302px')
+  grid.update()
+  assert.equal(grid.rowHeight, 322)
+})
@@ -0,0 +1,178 @@
+import BookingApp, { CONFIG } from '../booking.js'
+import { mockDOM, setupTimersAndScroll } from './setupTests.js'
+
+const SLOT_COUNT = 50000
+
+const buildSlots = (count) => {
+  const start = new Date()
+  start.setHours(8, 0, 0, 0)
+  const locations = ['London', 'Manchester', 'Leeds', 'Bristol']
+  return Array.from({ length: count }, (_, i) => ({
+    id: String(i),
+    // Many workshops, all with slots between 08:00 and 18:00 today
+    time: new Date(start.getTime() + (i % 600) * 60 * 1000).toISOString(),
+    location: locations[i % locations.length],
+    vehicleTypes: i % 2 ? ['Car', 'Truck'] : ['Car']
+  }))
+}
+
+describe('Virtualized time slot rendering', () => {
+  let bookingApp
+  let slots
+
+  beforeAll(() => {
+    slots = buildSlots(SLOT_COUNT)
+  })
+
+  beforeEach(() => {
+    mockDOM()
+    setupTimersAndScroll()
+    bookingApp = new BookingApp().init()
+    global.fetch = jest.fn(() =>
+      Promise.resolve({
+        ok: true,
+        json: () => Promise.resolve(slots)
+      })
+    )
+  })
+
+  afterEach(() => {
+    bookingApp.timesGrid.detach()
+    document.body.innerHTML = ''
+    jest.useRealTimers()
+    jest.restoreAllMocks()
+  })
+
+  const cards = () => bookingApp.uiElements.timesContainer.querySelectorAll('.time-card')
+
+  test('renders only the visible window of 50k slots quickly', async () => {
+    const started = performance.now()
+    await bookingApp.fetchTimes()
+    const fetchDuration = performance.now() - started
+
+    expect(bookingApp.allTimes.length).toBe(SLOT_COUNT)
+    expect(bookingApp.timesGrid.items.length).toBe(SLOT_COUNT)
+    expect(cards().length).toBeGreaterThan(0)
+    expect(cards().length).toBeLessThan(50)
+    // Generous bound: a full render of 50k cards in jsdom takes many seconds
+    expect(fetchDuration).toBeLessThan(2000)
+  })
+
+  test('filter changes re-render without rebuilding the list', async () => {
+    await bookingApp.fetchTimes()
+    const { vehicleTypeSelect, locationSelect } = bookingApp.uiElements
+
+    const started = performance.now()
+    for (let i = 0; i < 10; i++) {
+      vehicleTypeSelect.value = i % 2 ? 'Truck' : 'all'
+      vehicleTypeSelect.dispatchEvent(new Event('change'))
+      locationSelect.value = i % 3 ? 'London' : 'all'
+      locationSelect.dispatchEvent(new Event('change'))
+    }
+    const filterDuration = performance.now() - started
+
+    // Last iteration left the filters on Truck / all locations
+    expect(bookingApp.timesGrid.items.every(time => time.vehicleTypes.includes('Truck'))).toBe(true)
+    expect(cards().length).toBeLessThan(50)
+    expect(filterDuration).toBeLessThan(2000)
+  })
+
+  test('does not parse dates while filtering', async () => {
+    await bookingApp.fetchTimes()
+    const RealDate = global.Date
+    let constructed = 0
+    global.Date = class extends RealDate {
+      constructor(...args) {
+        super(...args)
+        constructed++
+      }
+    }
+
+    try {
+      bookingApp.filterTimes()
+    } finally {
+      global.Date = RealDate
+    }
+    // Only the "today" reference date is built, never one per slot
+    expect(constructed).toBeLessThan(10)
+  })
+
+  test('reuses card nodes while scrolling', async () => {
+    await bookingApp.fetchTimes()
+    const container = bookingApp.uiElements.timesContainer
+    const before = Array.from(cards())
+    const firstId = before[0].dataset.id
+
+    // Scroll the container 100 rows up past the top of the viewport
+    jest.spyOn(container, 'getBoundingClientRect').mockReturnValue({
+      top: -100 * CONFIG.VIRTUAL_LIST.ROW_HEIGHT, bottom: 0, left: 0, right: 0, width: 0, height: 0
+    })
+    bookingApp.timesGrid.update()
+
+    const after = Array.from(cards())
+    // The window now has overscan rows above it too, so it may hold a few more cards
+    expect(after.length).toBeGreaterThanOrEqual(before.length)
+    expect(after.length).toBeLessThan(50)
+    expect(before.every(card => after.includes(card))).toBe(true)
+    expect(after[0].dataset.id).not.toBe(firstId)
+    expect(parseInt(container.style.paddingTop, 10)).toBeGreaterThan(0)
+
+    const button = after[0].querySelector('.book-button')
+    expect(button.dataset.id).toBe(after[0].dataset.id)
+    expect(button.dataset.location).toBe(bookingApp.timesGrid.items[bookingApp.timesGrid.range.start].location)
+  })
+
+  test('takes the column count from the laid-out grid', async () => {
+    const container = bookingApp.uiElements.timesContainer
+    // Wide enough for two 300px columns, but the narrow-screen media query draws one
+    Object.defineProperty(container, 'clientWidth', { configurable: true, value: 700 })
+    const computedStyle = jest.spyOn(window, 'getComputedStyle')
+    computedStyle.mockReturnValue({ gridTemplateColumns: '700px' })
+    expect(bookingApp.timesGrid.getColumnCount()).toBe(1)
+
+    computedStyle.mockReturnValue({ gridTemplateColumns: '310px 310px 310px' })
+    await bookingApp.fetchTimes()
+    const { range } = bookingApp.timesGrid
+    expect((range.end - range.start) % 3).toBe(0)
+    const rows = Math.ceil(SLOT_COUNT / 3)
+    const renderedRows = (range.end - range.start) / 3
+    expect(parseInt(container.style.paddingBottom, 10))
+      .toBe((rows - renderedRows) * CONFIG.VIRTUAL_LIST.ROW_HEIGHT)
+
+    // Unresolved templates (e.g. before layout) fall back to the container width
+    computedStyle.mockReturnValue({ gridTemplateColumns: 'repeat(auto-fill, minmax(300px, 1fr))' })
+    expect(bookingApp.timesGrid.getColumnCount()).toBe(2)
+  })
+
+  test('grows rows to fit cards whose content wraps', async () => {
+    await bookingApp.fetchTimes()
+    const grid = bookingApp.timesGrid
+    const container = bookingApp.uiElements.timesContainer
+    const card = cards()[0]
+    Object.defineProperty(card, 'scrollHeight', { configurable: true, value: 300 })
+    Object.defineProperty(card, 'offsetHeight', { configurable: true, value: 242 })
+    Object.defineProperty(card, 'clientHeight', { configurable: true, value: 240 })
+
+    grid.update()
+    expect(grid.rowHeight).toBe(302 + CONFIG.VIRTUAL_LIST.GAP)
+    expect(container.style.gridAutoRows).toBe('302px')
+
+    // Rows never shrink below a card that already fits
+    grid.update()
+    expect(grid.rowHeight).toBe(302 + CONFIG.VIRTUAL_LIST.GAP)
+  })
+
+  test('shows the empty message and recovers from it', async () => {
+    await bookingApp.fetchTimes()
+    const { locationSelect, timesContainer } = bookingApp.uiElements
+
+    bookingApp.displayTimes([])
+    expect(cards().length).toBe(0)
+    expect(timesContainer.textContent).toContain('No available times')
+
+    locationSelect.value = 'all'
+    bookingApp.filterTimes()
+    expect(cards().length).toBeGreaterThan(0)
+    expect(timesContainer.textContent).not.toContain('No available times')
+  })
+})
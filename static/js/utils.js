@@ -41,6 +41,14 @@ export function validateForm(bookingData) {
   }
 }
 
+// One key per booking attempt lets the server replay the result to retries of the same attempt
+export function createIdempotencyKey() {
+  if (typeof crypto !== 'undefined' && typeof crypto.randomUUID === 'function') {
+    return crypto.randomUUID()
+  }
+  return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}-${Math.random().toString(36).slice(2)}`
+}
+
 export function getVehicleIcon(vehicleTypes, VEHICLE_ICONS) {
   if (vehicleTypes.includes('Truck')) return VEHICLE_ICONS.getIcon('Truck')
   if (vehicleTypes.includes('SUV')) return VEHICLE_ICONS.getIcon('SUV')
@@ -0,0 +1,154 @@
+// Description: Windowed rendering for long grids of equally sized cards
+// Path: static/js/virtualList.js
+
+// Only the rows intersecting the viewport (plus a few overscan rows) get DOM nodes. The rows
+// above and below are represented by container padding, so the page keeps its full scroll
+// height. Card nodes are pooled and re-bound to new items while scrolling instead of being
+// recreated. The column count is read from the grid CSS actually laid out, and rows grow when a
+// rendered card needs more than `rowHeight` so that content is never clipped.
+export class VirtualGrid {
+  constructor(container, { rowHeight, minColumnWidth, gap = 0, overscan = 2, createItem, updateItem }) {
+    this.container = container
+    this.rowHeight = rowHeight
+    this.minColumnWidth = minColumnWidth
+    this.gap = gap
+    this.overscan = overscan
+    this.createItem = createItem
+    this.updateItem = updateItem
+    this.items = []
+    this.pool = []
+    this.range = { start: 0, end: 0 }
+    this.frameRequested = false
+    this.onViewportChange = () => this.scheduleUpdate()
+  }
+
+  attach() {
+    window.addEventListener('scroll', this.onViewportChange, { passive: true })
+    window.addEventListener('resize', this.onViewportChange)
+    return this
+  }
+
+  detach() {
+    window.removeEventListener('scroll', this.onViewportChange)
+    window.removeEventListener('resize', this.onViewportChange)
+  }
+
+  setItems(items) {
+    this.items = items
+    this.range = { start: 0, end: 0 }
+    this.pool.forEach(node => { node.boundItem = null })
+    this.update()
+  }
+
+  clear() {
+    this.items = []
+    this.pool.forEach(node => {
+      node.boundItem = null
+      node.remove()
+    })
+    this.container.style.paddingTop = ''
+    this.container.style.paddingBottom = ''
+    this.range = { start: 0, end: 0 }
+  }
+
+  getColumnCount() {
+    // A laid-out grid reports its resolved tracks, e.g. "310px 310px", whatever media query applied
+    const tracks = window.getComputedStyle(this.container).gridTemplateColumns
+    if (tracks && /^(\s*[\d.]+px)+\s*$/.test(tracks)) {
+      return tracks.trim().split(/\s+/).length
+    }
+    const width = this.container.clientWidth
+    if (!width) return 1
+    return Math.max(1, Math.floor((width + this.gap) / (this.minColumnWidth + this.gap)))
+  }
+
+  getVisibleRange() {
+    const columns = this.getColumnCount()
+    const totalRows = Math.ceil(this.items.length / columns)
+    const rect = this.container.getBoundingClientRect()
+    const viewportHeight = window.innerHeight || document.documentElement.clientHeight
+    const top = Math.max(0, -rect.top)
+
+    const visibleRows = Math.ceil(viewportHeight / this.rowHeight) + this.overscan
+    const lastRow = Math.min(totalRows, Math.ceil((top + viewportHeight) / this.rowHeight) + this.overscan)
+    // Keep the window filled when the scroll position is past the end of a shrunk list
+    const firstRow = Math.max(0, Math.min(
+      Math.floor(top / this.rowHeight) - this.overscan,
+      totalRows - visibleRows
+    ))
+
+    return {
+      start: firstRow * columns,
+      end: Math.min(lastRow * columns, this.items.length),
+      columns,
+      totalRows
+    }
+  }
+
+  scheduleUpdate() {
+    if (this.frameRequested) return
+    this.frameRequested = true
+    const schedule = window.requestAnimationFrame || ((callback) => setTimeout(callback, 16))
+    schedule(() => {
+      this.frameRequested = false
+      this.update()
+    })
+  }
+
+  update() {
+    const { start, end, columns, totalRows } = this.getVisibleRange()
+    const count = end - start
+
+    while (this.pool.length < count) {
+      this.pool.push(this.createItem())
+    }
+
+    const fragment = document.createDocumentFragment()
+    for (let i = 0; i < count; i++) {
+      const node = this.pool[i]
+      const item = this.items[start + i]
+      if (node.boundItem !== item) {
+        this.updateItem(node, item)
+        node.boundItem = item
+      }
+      if (node.parentNode !== this.container) {
+        fragment.appendChild(node)
+      }
+    }
+    this.container.appendChild(fragment)
+
+    for (let i = count; i < this.pool.length && this.pool[i].parentNode; i++) {
+      this.pool[i].boundItem = null
+      this.pool[i].remove()
+    }
+
+    const firstRow = start / columns
+    const renderedRows = Math.ceil(count / columns)
+    this.container.style.paddingTop = `${firstRow * this.rowHeight}px`
+    this.container.style.paddingBottom = `${Math.max(0, totalRows - firstRow - renderedRows) * this.rowHeight}px`
+    this.range = { start, end }
+
+    if (this.fitRowHeight(count)) {
+      this.update()
+    }
+  }
+
+  // Grow the rows to the tallest rendered card, e.g. when headings wrap on a narrow screen.
+  // Returns true if the row height changed and the window has to be recomputed.
+  fitRowHeight(count) {
+    let tallest = 0
+    for (let i = 0; i < count; i++) {
+      const node = this.pool[i]
+      // scrollHeight covers overflowing content; add the borders it leaves out
+      tallest = Math.max(tallest, node.scrollHeight + node.offsetHeight - node.clientHeight)
+    }
+    if (tallest + this.gap <= this.rowHeight) return false
+    this.rowHeight = tallest + this.gap
+    this.container.style.gridAutoRows = `${tallest}px`
+    return true
+  }
+
+  getRenderedCount() {
+    return this.range.end - this.range.start
+  }
+}
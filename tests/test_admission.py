@@ -0,0 +1,84 @@
+import threading
+import time
+import pytest
+from services.admission import ClientRateLimiter, UpstreamLimiter, Overloaded
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_rate_limiter_disabled_by_default():
+    """Test that a zero rate admits everything."""
+    limiter = ClientRateLimiter()
+    assert all(limiter.acquire('client') is None for _ in range(100))
+
+def test_rate_limiter_burst_and_refill():
+    """Test that clients get a burst and then refill at the configured rate."""
+    clock = FakeClock()
+    limiter = ClientRateLimiter(rate=2, burst=3, clock=clock)
+    assert [limiter.acquire('a') for _ in range(3)] == [None, None, None]
+    assert limiter.acquire('a') == 1
+    # Other clients have their own bucket
+    assert limiter.acquire('b') is None
+
+    clock.now = 0.5
+    assert limiter.acquire('a') is None
+    assert limiter.acquire('a') == 1
+
+def test_rate_limiter_client_cap():
+    """Test that the bucket table stays capped and cheap beyond max_clients."""
+    clock = FakeClock()
+    limiter = ClientRateLimiter(rate=0.01, burst=1, max_clients=1000, clock=clock)
+    started = time.perf_counter()
+    for i in range(30000):
+        assert limiter.acquire(f'client-{i}') is None
+    assert time.perf_counter() - started < 2
+    assert len(limiter._buckets) == 1000
+
+    # Recently seen clients keep their (empty) bucket; the oldest ones were dropped
+    assert limiter.acquire('client-29999') is not None
+    assert limiter.acquire('client-0') is None
+
+def test_upstream_limiter_sheds_when_queue_full():
+    """Test that calls beyond in-flight and queue limits are rejected immediately."""
+    limiter = UpstreamLimiter(max_in_flight=1, max_queue=0, queue_timeout=1, retry_after=3)
+    with limiter.slot('London'):
+        assert limiter.in_flight('London') == 1
+        with pytest.raises(Overloaded) as excinfo:
+            with limiter.slot('London'):
+                pass
+        assert excinfo.value.retry_after == 3
+        # Other workshops are unaffected
+        with limiter.slot('Manchester'):
+            pass
+    assert limiter.in_flight('London') == 0
+
+def test_upstream_limiter_queue_timeout():
+    """Test that a queued call is shed when no slot frees up in time."""
+    limiter = UpstreamLimiter(max_in_flight=1, max_queue=1, queue_timeout=0.01)
+    with limiter.slot('London'):
+        with pytest.raises(Overloaded):
+            with limiter.slot('London'):
+                pass
+
+def test_upstream_limiter_queued_call_proceeds():
+    """Test that a queued call runs once the in-flight call finishes."""
+    limiter = UpstreamLimiter(max_in_flight=1, max_queue=1, queue_timeout=5)
+    entered = threading.Event()
+    release = threading.Event()
+
+    def hold():
+        with limiter.slot('London'):
+            entered.set()
+            release.wait()
+
+    worker = threading.Thread(target=hold)
+    worker.start()
+    entered.wait()
+    threading.Timer(0.05, release.set).start()
+    with limiter.slot('London'):
+        assert limiter.in_flight('London') == 1
+    worker.join()
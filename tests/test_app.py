@@ -1,9 +1,12 @@
 import pytest
-from app import app, validate_booking_data, get_service_times, handle_xml_response, handle_json_list_response, handle_json_dict_response
+import re
+from app import app, reservations, idempotency_store, rate_limiter, upstream_limiter, latency_tracker, availability_snapshot, warmup_state, validate_booking_data, get_service_times, handle_xml_response, handle_json_list_response, handle_json_dict_response
 import requests
 import requests_mock
 import json
+import gzip
 from datetime import datetime, timedelta
+from services import Overloaded
 
 class MockService:
     def __init__(self, name, base_url, available_times_path, content_type):
@@ -15,6 +18,10 @@ class MockService:
 @pytest.fixture
 def client():
     app.config['TESTING'] = True
+    reservations.clear()
+    idempotency_store.clear()
+    rate_limiter.clear()
+    availability_snapshot.update(updated=None, times=[])
     with app.test_client() as client:
         yield client
 
@@ -232,3 +239,463 @@ def test_book_appointment_server_error(client, requests_mock):
     result = response.get_json()
     assert result['success'] == False
     assert 'Failed to process booking' in result['error']
+
+def test_book_batch(client, requests_mock):
+    base = {
+        'name': 'John Doe',
+        'email': 'john@example.com',
+        'phone': '+37256560978',
+        'vehicle': 'Toyota Corolla',
+        'serviceType': 'Regular'
+    }
+    bookings = [
+        {**base, 'timeslotId': '1', 'location': 'London'},
+        {**base, 'timeslotId': '7', 'location': 'Manchester'},
+        {**base, 'timeslotId': '1', 'location': 'London'},  # duplicate slot
+        {**base, 'timeslotId': '2', 'location': 'London'},
+        {'timeslotId': '3', 'location': 'London'}  # missing fields
+    ]
+    requests_mock.put('http://localhost:9003/api/v1/tire-change-times/1/booking', text='<response><status>confirmed</status></response>')
+    requests_mock.put('http://localhost:9003/api/v1/tire-change-times/2/booking', status_code=500, text='Server error')
+    requests_mock.post('http://localhost:9004/api/v2/tire-change-times/7/booking', json={'id': 7})
+
+    response = client.post('/api/book/batch', json={'bookings': bookings})
+    assert response.status_code == 200
+    result = response.get_json()
+    assert result['success'] == False
+    assert result['booked'] == 2
+    assert result['failed'] == 3
+
+    items = result['results']
+    assert [item['index'] for item in items] == [0, 1, 2, 3, 4]
+    assert items[0]['success'] and items[0]['booking_id'] == '1'
+    assert items[1]['success'] and items[1]['booking_id'] == '7'
+    assert items[2]['error'] == 'Duplicate timeslot in batch'
+    assert items[3]['error'] == 'Failed to process booking'
+    assert items[4]['error'] == 'Missing required fields'
+    # The duplicate never reached the workshop
+    london_calls = [r for r in requests_mock.request_history if r.url.endswith('/1/booking')]
+    assert len(london_calls) == 1
+
+def test_book_batch_invalid_field_types(client, requests_mock):
+    base = {
+        'name': 'John Doe',
+        'email': 'john@example.com',
+        'phone': '+37256560978',
+        'vehicle': 'Toyota Corolla',
+        'serviceType': 'Regular'
+    }
+    bookings = [
+        {**base, 'timeslotId': '1', 'location': ['London']},
+        {**base, 'timeslotId': '1', 'location': {'name': 'London'}},
+        {**base, 'timeslotId': ['1'], 'location': 'London'},
+        {**base, 'timeslotId': '1', 'location': 42}
+    ]
+    response = client.post('/api/book/batch', json={'bookings': bookings})
+    assert response.status_code == 200
+    errors = [item['error'] for item in response.get_json()['results']]
+    assert errors[0].startswith('Invalid location')
+    assert errors[1].startswith('Invalid location')
+    assert errors[2] == 'Invalid timeslotId'
+    assert errors[3].startswith('Invalid location')
+    assert requests_mock.call_count == 0
+
+def test_book_batch_invalid_body(client):
+    response = client.post('/api/book/batch', json={'bookings': []})
+    assert response.status_code == 400
+    assert response.get_json()['success'] == False
+
+def test_book_batch_idempotency_key(client, requests_mock):
+    base = {
+        'name': 'John Doe',
+        'email': 'john@example.com',
+        'phone': '+37256560978',
+        'vehicle': 'Toyota Corolla',
+        'serviceType': 'Regular'
+    }
+    bookings = [
+        {**base, 'timeslotId': '1', 'location': 'London'},
+        {**base, 'timeslotId': '7', 'location': 'Manchester'}
+    ]
+    requests_mock.put('http://localhost:9003/api/v1/tire-change-times/1/booking', text='<response><status>confirmed</status></response>')
+    requests_mock.post('http://localhost:9004/api/v2/tire-change-times/7/booking', json={'id': 7})
+    headers = {'Idempotency-Key': 'fleet-42'}
+
+    first = client.post('/api/book/batch', json={'bookings': bookings}, headers=headers)
+    # A retry after a lost response replays the results instead of reporting conflicts
+    retry = client.post('/api/book/batch', json={'bookings': bookings[::-1]}, headers=headers)
+    assert first.status_code == retry.status_code == 200
+    assert retry.get_json()['booked'] == 2
+    # Replayed results follow the retry's own item order
+    assert retry.get_json()['results'][::-1] == [
+        {**item, 'index': 1 - item['index']} for item in first.get_json()['results']
+    ]
+    assert requests_mock.call_count == 2
+
+    other = client.post('/api/book/batch', json={'bookings': bookings[:1]}, headers=headers)
+    assert other.status_code == 422
+
+def test_book_batch_idempotency_retries_failed_items(client, requests_mock):
+    base = {
+        'name': 'John Doe',
+        'email': 'john@example.com',
+        'phone': '+37256560978',
+        'vehicle': 'Toyota Corolla',
+        'serviceType': 'Regular'
+    }
+    bookings = [
+        {**base, 'timeslotId': '1', 'location': 'London'},
+        {**base, 'timeslotId': '7', 'location': 'Manchester'}
+    ]
+    london = requests_mock.put('http://localhost:9003/api/v1/tire-change-times/1/booking', text='<response><status>confirmed</status></response>')
+    manchester = requests_mock.post('http://localhost:9004/api/v2/tire-change-times/7/booking', status_code=500)
+    headers = {'Idempotency-Key': 'fleet-43'}
+
+    first = client.post('/api/book/batch', json={'bookings': bookings}, headers=headers).get_json()
+    assert first['booked'] == 1
+
+    # The workshop recovers: the retry books the failed item and replays the booked one
+    manchester = requests_mock.post('http://localhost:9004/api/v2/tire-change-times/7/booking', json={'id': 7})
+    retry = client.post('/api/book/batch', json={'bookings': bookings}, headers=headers).get_json()
+    assert retry['success'] and retry['booked'] == 2
+    assert retry['results'][0] == first['results'][0]
+    assert london.call_count == 1
+    assert manchester.call_count == 1
+
+    # Now everything is replayed without upstream calls
+    again = client.post('/api/book/batch', json={'bookings': bookings}, headers=headers).get_json()
+    assert again == retry
+    assert london.call_count == manchester.call_count == 1
+
+def test_book_batch_idempotency_failures_not_stored(client, requests_mock):
+    base = {
+        'name': 'John Doe',
+        'email': 'john@example.com',
+        'phone': '+37256560978',
+        'vehicle': 'Toyota Corolla',
+        'serviceType': 'Regular'
+    }
+    bookings = [{**base, 'timeslotId': '2', 'location': 'London'}]
+    requests_mock.put('http://localhost:9003/api/v1/tire-change-times/2/booking', status_code=500, text='Server error')
+    headers = {'Idempotency-Key': 'fleet-44'}
+
+    assert client.post('/api/book/batch', json={'bookings': bookings}, headers=headers).get_json()['booked'] == 0
+    assert client.post('/api/book/batch', json={'bookings': bookings}, headers=headers).get_json()['booked'] == 0
+    assert requests_mock.call_count == 2
+    # A key that only saw failures can still be used for another batch
+    other = client.post('/api/book/batch', json={'bookings': [{**bookings[0], 'timeslotId': '3'}]}, headers=headers)
+    assert other.status_code == 200
+
+def test_book_appointment_slot_conflict(client, requests_mock):
+    booking_data = {
+        'timeslotId': '1',
+        'location': 'London',
+        'name': 'John Doe',
+        'email': 'john@example.com',
+        'phone': '+37256560978',
+        'vehicle': 'Toyota Corolla',
+        'serviceType': 'Regular'
+    }
+    requests_mock.put('http://localhost:9003/api/v1/tire-change-times/1/booking', text='<response><status>confirmed</status></response>')
+
+    assert client.post('/api/book', json=booking_data).status_code == 200
+    response = client.post('/api/book', json=booking_data)
+    assert response.status_code == 409
+    assert response.get_json()['success'] == False
+    assert requests_mock.call_count == 1
+
+def test_book_appointment_idempotency_key(client, requests_mock):
+    booking_data = {
+        'timeslotId': '1',
+        'location': 'London',
+        'name': 'John Doe',
+        'email': 'john@example.com',
+        'phone': '+37256560978',
+        'vehicle': 'Toyota Corolla',
+        'serviceType': 'Regular'
+    }
+    requests_mock.put('http://localhost:9003/api/v1/tire-change-times/1/booking', text='<response><status>confirmed</status></response>')
+    headers = {'Idempotency-Key': 'abc-123'}
+
+    first = client.post('/api/book', json=booking_data, headers=headers)
+    retry = client.post('/api/book', json=booking_data, headers=headers)
+    assert first.status_code == retry.status_code == 200
+    assert retry.get_json() == first.get_json()
+    assert requests_mock.call_count == 1
+
+    other = client.post('/api/book', json={**booking_data, 'timeslotId': '2'}, headers=headers)
+    assert other.status_code == 422
+
+def test_book_appointment_failure_releases_slot(client, requests_mock):
+    booking_data = {
+        'timeslotId': '1',
+        'location': 'London',
+        'name': 'John Doe',
+        'email': 'john@example.com',
+        'phone': '+37256560978',
+        'vehicle': 'Toyota Corolla',
+        'serviceType': 'Regular'
+    }
+    requests_mock.put('http://localhost:9003/api/v1/tire-change-times/1/booking', status_code=500, text='Server error')
+
+    assert client.post('/api/book', json=booking_data).status_code == 500
+    assert client.post('/api/book', json=booking_data).status_code == 500
+    assert requests_mock.call_count == 2
+
+def test_book_appointment_timeout(client, requests_mock):
+    booking_data = {
+        'timeslotId': '1',
+        'location': 'London',
+        'name': 'John Doe',
+        'email': 'john@example.com',
+        'phone': '+37256560978',
+        'vehicle': 'Toyota Corolla',
+        'serviceType': 'Regular'
+    }
+    requests_mock.put('http://localhost:9003/api/v1/tire-change-times/1/booking', exc=requests.exceptions.ReadTimeout)
+
+    response = client.post('/api/book', json=booking_data)
+    assert response.status_code == 500
+    assert requests_mock.last_request.timeout == app.config['UPSTREAM_BOOKING_TIMEOUT_SECONDS']
+    # The timed-out call gave back its upstream slot and its lease
+    assert upstream_limiter.in_flight('London') == 0
+    assert not reservations.is_held('London', '1')
+
+def test_rate_limit(client, monkeypatch):
+    monkeypatch.setattr(rate_limiter, 'rate', 1)
+    monkeypatch.setattr(rate_limiter, 'burst', 1)
+    booking_data = {'timeslotId': '1', 'location': 'London'}
+
+    assert client.post('/api/book', json=booking_data).status_code == 400
+    response = client.post('/api/book', json=booking_data)
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '1'
+    # Pages are not rate limited
+    assert client.get('/').status_code == 200
+
+def test_upstream_overload_sheds_with_503(client, monkeypatch):
+    def overloaded(service_name):
+        raise Overloaded(service_name, 2)
+
+    monkeypatch.setattr(upstream_limiter, 'slot', overloaded)
+    response = client.get('/api/times')
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '2'
+    assert response.get_json()['success'] == False
+
+    booking_data = {
+        'timeslotId': '1',
+        'location': 'London',
+        'name': 'John Doe',
+        'email': 'john@example.com',
+        'phone': '+37256560978',
+        'vehicle': 'Toyota Corolla',
+        'serviceType': 'Regular'
+    }
+    response = client.post('/api/book', json=booking_data)
+    assert response.status_code == 503
+    # The shed booking did not keep the slot reserved
+    assert not reservations.is_held('London', '1')
+
+def test_get_times_skips_overloaded_workshop(client, requests_mock, monkeypatch):
+    real_slot = upstream_limiter.slot
+    def slot(service_name):
+        if service_name == 'London':
+            raise Overloaded(service_name, 2)
+        return real_slot(service_name)
+
+    monkeypatch.setattr(upstream_limiter, 'slot', slot)
+    requests_mock.get(re.compile('http://localhost:9004/.*'), json=[
+        {'time': '2025-03-16T10:00:00Z', 'id': '2', 'available': True}
+    ])
+    response = client.get('/api/times')
+    assert response.status_code == 200
+    assert [t['location'] for t in response.get_json()] == ['Manchester']
+    assert response.headers['X-Unavailable-Workshops'] == 'London'
+
+def test_get_service_times_hedged(requests_mock, monkeypatch):
+    monkeypatch.setitem(app.config, 'HEDGING_ENABLED', True)
+    latency_tracker.clear()
+    service = MockService(
+        name='London',
+        base_url='http://localhost:9003',
+        available_times_path='/api/v1/tire-change-times/available',
+        content_type='text/xml'
+    )
+    today = datetime.now().strftime('%Y-%m-%d')
+    future = (datetime.now() + timedelta(days=5)).strftime('%Y-%m-%d')
+    xml_response = """
+    <tireChangeTimesResponse>
+        <availableTime>
+            <time>2025-03-15T14:30:00Z</time>
+            <uuid>1</uuid>
+        </availableTime>
+    </tireChangeTimesResponse>
+    """
+    requests_mock.get(f'http://localhost:9003/api/v1/tire-change-times/available?from={today}&until={future}', text=xml_response)
+    times = get_service_times(service)
+    assert len(times) == 1
+
+def test_get_times_upstream_timeout(client, requests_mock):
+    requests_mock.get(re.compile('http://localhost:9003/.*'), exc=requests.exceptions.ReadTimeout)
+    requests_mock.get(re.compile('http://localhost:9004/.*'), json=[
+        {'time': '2025-03-16T10:00:00Z', 'id': '2', 'available': True}
+    ])
+    response = client.get('/api/times')
+    assert response.status_code == 200
+    assert [t['location'] for t in response.get_json()] == ['Manchester']
+    # Every availability request carries a timeout
+    assert all(r.timeout for r in requests_mock.request_history)
+
+def test_profiling_disabled_by_default(client):
+    response = client.get('/', headers={'X-Profile': '1'})
+    assert 'Server-Timing' not in response.headers
+    assert client.post('/admin/profile', json={'requests': 1}).status_code == 404
+
+def test_profiling_server_timing(client, requests_mock, monkeypatch):
+    monkeypatch.setitem(app.config, 'PROFILING_ENABLED', True)
+    requests_mock.get(re.compile('.*'), json=[])
+
+    response = client.get('/api/times', headers={'X-Profile': '1'})
+    assert response.status_code == 200
+    timing = response.headers['Server-Timing']
+    for phase in ('upstream-london', 'upstream-manchester', 'parse', 'sort', 'jsonify', 'total'):
+        assert f'{phase};dur=' in timing
+
+    assert 'Server-Timing' not in client.get('/api/times').headers
+
+def test_profiling_admin_window(client, requests_mock, monkeypatch):
+    monkeypatch.setitem(app.config, 'PROFILING_ENABLED', True)
+    monkeypatch.setitem(app.config, 'PROFILING_ADMIN_TOKEN', 'secret')
+    requests_mock.get(re.compile('.*'), json=[])
+    headers = {'X-Admin-Token': 'secret'}
+
+    assert client.post('/admin/profile', json={'requests': 1}).status_code == 404
+    assert client.post('/admin/profile', json=[1], headers=headers).status_code == 400
+    assert client.post('/admin/profile', json={'requests': 'many'}, headers=headers).status_code == 400
+    assert client.post('/admin/profile', json={'requests': [1]}, headers=headers).status_code == 400
+    response = client.post('/admin/profile', json={'requests': 1, 'mode': 'memory'}, headers=headers)
+    assert response.status_code == 202
+    assert client.post('/admin/profile', json={'requests': 1}, headers=headers).status_code == 409
+
+    assert 'Server-Timing' in client.get('/api/times').headers
+
+    status = client.get('/admin/profile', headers=headers).get_json()
+    assert status['finished'] == True
+    assert 'sort' in status['phaseTotalsMs']
+    folded = client.get('/admin/profile?format=folded', headers=headers)
+    assert folded.mimetype == 'text/plain'
+    assert folded.data
+
+def test_profiling_admin_requires_token(client, monkeypatch):
+    monkeypatch.setitem(app.config, 'PROFILING_ENABLED', True)
+    # Without a configured token the admin endpoints stay closed
+    assert client.post('/admin/profile', json={'requests': 1}).status_code == 404
+    assert client.get('/admin/profile').status_code == 404
+
+def test_profiling_admin_stop(client, monkeypatch):
+    monkeypatch.setitem(app.config, 'PROFILING_ENABLED', True)
+    monkeypatch.setitem(app.config, 'PROFILING_ADMIN_TOKEN', 'secret')
+    headers = {'X-Admin-Token': 'secret'}
+
+    assert client.post('/admin/profile', json={'requests': 50, 'mode': 'memory'}, headers=headers).status_code == 202
+    assert client.delete('/admin/profile').status_code == 404
+    response = client.delete('/admin/profile', headers=headers)
+    assert response.status_code == 200
+    assert client.get('/admin/profile', headers=headers).get_json()['finished'] == True
+    # A new window can be started straight away
+    assert client.post('/admin/profile', json={'requests': 1}, headers=headers).status_code == 202
+    client.delete('/admin/profile', headers=headers)
+
+def test_index_serves_hashed_assets(client):
+    response = client.get('/')
+    html = response.data.decode('utf-8')
+    match = re.search(r'src="(/assets/booking\.[0-9a-f]+\.js)"', html)
+    assert match
+    assert re.search(r'href="/assets/styles\.[0-9a-f]+\.css"', html)
+    assert 'id="initial-times"' not in html
+
+    asset = client.get(match.group(1), headers={'Accept-Encoding': 'gzip'})
+    assert asset.status_code == 200
+    assert asset.headers['Content-Encoding'] == 'gzip'
+    assert 'immutable' in asset.headers['Cache-Control']
+    assert asset.headers['Vary'] == 'Accept-Encoding'
+    bundle = gzip.decompress(asset.data).decode('utf-8')
+    assert 'class BookingApp' in bundle
+    assert "from './" not in bundle
+
+    assert client.get('/assets/booking.0000.js').status_code == 404
+
+def test_index_renders_snapshot(client, requests_mock):
+    requests_mock.get(re.compile('http://localhost:9003/.*'), text="""
+    <tireChangeTimesResponse>
+        <availableTime>
+            <time>2025-03-15T14:30:00Z</time>
+            <uuid>1</uuid>
+        </availableTime>
+    </tireChangeTimesResponse>
+    """)
+    requests_mock.get(re.compile('http://localhost:9004/.*'), json=[
+        {'time': '2025-03-16T10:00:00Z', 'id': '2', 'available': True}
+    ])
+    assert client.get('/api/times').status_code == 200
+    reservations.acquire('Manchester', '2', 'someone')
+
+    html = client.get('/').data.decode('utf-8')
+    match = re.search(r'<script type="application/json" id="initial-times">(.*?)</script>', html, re.S)
+    assert match
+    initial_times = json.loads(match.group(1))
+    # Raw upstream times only, booking.js formats them in the browser's time zone;
+    # slots already being booked are left out
+    assert [(t['id'], t['time']) for t in initial_times] == [('1', '2025-03-15T14:30:00Z')]
+    assert 'class="time-card"' not in html
+
+def test_get_times_nearest(client, requests_mock):
+    requests_mock.get(re.compile('http://localhost:9004/.*'), json=[
+        {'time': '2025-03-16T10:00:00Z', 'id': '2', 'available': True}
+    ])
+
+    # Salford is next to Manchester
+    response = client.get('/api/times?lat=53.49&lon=-2.27&nearest=1')
+    assert response.status_code == 200
+    times = response.get_json()
+    assert [t['location'] for t in times] == ['Manchester']
+    assert times[0]['distanceKm'] < 5
+    # London was never queried
+    assert all('9004' in r.url for r in requests_mock.request_history)
+
+def test_get_times_radius_without_matches(client, requests_mock):
+    response = client.get('/api/times?lat=59.44&lon=24.75&radius=100')
+    assert response.status_code == 200
+    assert response.get_json() == []
+    assert requests_mock.call_count == 0
+
+def test_get_times_invalid_position(client):
+    assert client.get('/api/times?lat=51.5').status_code == 400
+    assert client.get('/api/times?lat=51.5&lon=0').status_code == 400
+    assert client.get('/api/times?lat=abc&lon=0&nearest=1').status_code == 400
+    assert client.get('/api/times?lat=51.5&lon=0&nearest=0').status_code == 400
+
+def test_readiness(client, monkeypatch):
+    # Warm-up is disabled by default, so the worker is ready straight away
+    response = client.get('/ready')
+    assert response.status_code == 200
+    assert response.get_json()['ready'] == True
+
+    monkeypatch.setattr(warmup_state, 'status', warmup_state.RUNNING)
+    response = client.get('/ready')
+    assert response.status_code == 503
+    assert response.get_json()['status'] == 'running'
+
+def test_warmup_starts_lazily(client, monkeypatch):
+    import app as app_module
+    started = []
+    monkeypatch.setitem(app.config, 'WARMUP_ENABLED', True)
+    monkeypatch.setattr(app_module, 'warmup_pid', None)
+    monkeypatch.setattr(app_module, 'start_warmup', lambda *args, **kwargs: started.append(args))
+    monkeypatch.setattr(warmup_state, 'status', warmup_state.PENDING)
+
+    # The first request in a worker starts its warm-up, later ones do not start another
+    assert client.get('/ready').status_code == 503
+    assert client.get('/ready').status_code == 503
+    assert len(started) == 1
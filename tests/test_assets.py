@@ -0,0 +1,73 @@
+import gzip
+import pytest
+from services.assets import bundle_module, build_assets, AssetBuildError
+
+@pytest.fixture
+def static_dir(tmp_path):
+    """Create a small ES module graph and stylesheet."""
+    js = tmp_path / "js"
+    js.mkdir()
+    (js / "utils.js").write_text(
+        "export function add(a, b) {\n  return a + b\n}\n"
+        "export const ZERO = 0\n"
+    )
+    (js / "widget.js").write_text(
+        "import { add } from './utils.js'\n"
+        "class Widget {\n  total() { return add(1, 2) }\n}\n"
+        "export default Widget\n"
+    )
+    (js / "main.js").write_text(
+        "import Widget from './widget.js'\n"
+        "import { add, ZERO } from './utils.js'\n"
+        "const CONFIG = { start: add(ZERO, 1) }\n"
+        "export { CONFIG }\n"
+        "export default Widget\n"
+    )
+    css = tmp_path / "css"
+    css.mkdir()
+    (css / "site.css").write_text("body { margin: 0; }\n")
+    return tmp_path
+
+def test_bundle_module(static_dir):
+    """Test that dependencies are inlined once, in order, without import statements."""
+    bundle = bundle_module(str(static_dir), "js/main.js")
+    assert "import " not in bundle
+    assert bundle.count("// js/utils.js") == 1
+    assert bundle.index("// js/utils.js") < bundle.index("// js/widget.js") < bundle.index("// js/main.js")
+    assert "return { add, ZERO }" in bundle
+    assert "return { default: Widget }" in bundle
+    assert "const Widget = __module_js_widget_js.default" in bundle
+    # The entry keeps its own exports
+    assert bundle.rstrip().endswith("export default Widget")
+
+def test_bundle_rejects_unsupported_syntax(static_dir):
+    """Test that renamed imports fail the build instead of producing a broken bundle."""
+    (static_dir / "js" / "main.js").write_text("import { add as plus } from './utils.js'\n")
+    with pytest.raises(AssetBuildError):
+        bundle_module(str(static_dir), "js/main.js")
+
+def test_bundle_rejects_cycles(static_dir):
+    """Test that import cycles are reported."""
+    (static_dir / "js" / "utils.js").write_text("import { x } from './main.js'\nexport const y = 1\n")
+    (static_dir / "js" / "main.js").write_text("import { y } from './utils.js'\nexport const x = y\n")
+    with pytest.raises(AssetBuildError):
+        bundle_module(str(static_dir), "js/main.js")
+
+def test_build_assets(static_dir):
+    """Test content hashing, precompression and encoding negotiation."""
+    manifest = build_assets(str(static_dir), ["js/main.js"], ["css/site.css"])
+    js = manifest.by_source["js/main.js"]
+    css = manifest.by_source["css/site.css"]
+
+    assert js.filename.startswith("main.") and js.filename.endswith(".js")
+    assert css.content_type.startswith("text/css")
+    assert manifest.by_filename[css.filename] is css
+    assert gzip.decompress(css.variants["gzip"]) == css.variants["identity"]
+
+    assert css.negotiate("gzip, deflate") == "gzip"
+    assert css.negotiate("") == "identity"
+
+    # The name changes with the content
+    (static_dir / "css" / "site.css").write_text("body { margin: 1px; }\n")
+    rebuilt = build_assets(str(static_dir), [], ["css/site.css"])
+    assert rebuilt.filename_for("css/site.css") != css.filename
@@ -0,0 +1,50 @@
+import random
+import pytest
+from services.geo import WorkshopIndex, haversine_km
+from services.service_loader import Service
+
+def make_service(name, latitude=None, longitude=None):
+    return Service(
+        name=name, version='1.0', base_url='http://localhost', content_type='application/json',
+        available_times_path='/available', booking_path='/booking', address='',
+        vehicle_types=['Car'], latitude=latitude, longitude=longitude
+    )
+
+def test_haversine_km():
+    """Test great-circle distance against a known value (London to Manchester)."""
+    assert haversine_km(51.5074, -0.1278, 53.4808, -2.2426) == pytest.approx(262, abs=2)
+    assert haversine_km(10, 20, 10, 20) == 0
+
+def test_nearest_and_within():
+    """Test k-nearest and radius queries on a few workshops."""
+    index = WorkshopIndex([
+        make_service('London', 51.5596, -0.0573),
+        make_service('Manchester', 53.4880, -2.2436),
+        make_service('Leeds', 53.8008, -1.5491),
+        make_service('Nowhere'),
+    ])
+    assert index.size == 3
+
+    nearest = index.nearest(53.48, -2.24, k=2)
+    assert [s.name for s, _ in nearest] == ['Manchester', 'Leeds']
+    assert nearest[0][1] < 1
+
+    within = index.within(51.5, -0.1, radius_km=50)
+    assert [s.name for s, _ in within] == ['London']
+    assert index.nearest(51.5, -0.1, k=3, radius_km=50) == within
+    assert index.within(0, 0, radius_km=10) == []
+
+def test_matches_brute_force():
+    """Test that the tree agrees with a linear scan on random points."""
+    rng = random.Random(7)
+    services = [make_service(f"W{i}", rng.uniform(-80, 80), rng.uniform(-180, 180)) for i in range(300)]
+    index = WorkshopIndex(services)
+
+    for _ in range(50):
+        lat, lon = rng.uniform(-80, 80), rng.uniform(-180, 180)
+        by_distance = sorted(services, key=lambda s: haversine_km(lat, lon, s.latitude, s.longitude))
+        assert [s.name for s, _ in index.nearest(lat, lon, k=5)] == [s.name for s in by_distance[:5]]
+
+        radius = rng.uniform(100, 3000)
+        expected = {s.name for s in services if haversine_km(lat, lon, s.latitude, s.longitude) <= radius}
+        assert {s.name for s, _ in index.within(lat, lon, radius)} == expected
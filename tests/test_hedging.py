@@ -0,0 +1,118 @@
+import threading
+import pytest
+from services.hedging import LatencyTracker, HedgeBudget, Hedger
+
+def test_latency_percentile():
+    """Test nearest-rank percentiles and the minimum sample requirement."""
+    tracker = LatencyTracker(window=100, min_samples=10)
+    for i in range(1, 10):
+        tracker.record('London', i / 100)
+    assert tracker.percentile('London', 95) is None
+
+    tracker.record('London', 0.10)
+    assert tracker.percentile('London', 50) == 0.05
+    assert tracker.percentile('London', 95) == 0.10
+    assert tracker.percentile('Manchester', 95) is None
+
+def test_latency_window():
+    """Test that only the most recent samples are kept."""
+    tracker = LatencyTracker(window=3, min_samples=1)
+    for seconds in (5.0, 1.0, 1.0, 1.0):
+        tracker.record('London', seconds)
+    assert tracker.percentile('London', 100) == 1.0
+
+def test_hedge_budget():
+    """Test that hedges are limited to the configured ratio of primary calls."""
+    budget = HedgeBudget(ratio=0.5, max_tokens=1)
+    assert not budget.withdraw()
+    budget.deposit()
+    assert not budget.withdraw()
+    budget.deposit()
+    budget.deposit()  # capped at max_tokens
+    assert budget.withdraw()
+    assert not budget.withdraw()
+
+def _warm_tracker(latency=0.01):
+    tracker = LatencyTracker(min_samples=1)
+    tracker.record('London', latency)
+    return tracker
+
+def test_hedger_without_samples_calls_once():
+    """Test that calls run directly until latency samples exist."""
+    calls = []
+    hedger = Hedger(LatencyTracker(min_samples=1), HedgeBudget(ratio=1))
+    assert hedger.call('London', lambda: calls.append(1) or 'ok') == 'ok'
+    assert calls == [1]
+    assert hedger.hedges_sent == 0
+
+def test_hedger_sends_hedge_for_slow_call():
+    """Test that a slow first attempt is overtaken by the hedge."""
+    release = threading.Event()
+    attempts = []
+
+    def fetch():
+        attempts.append(1)
+        if len(attempts) == 1:
+            release.wait(5)
+            return 'slow'
+        return 'fast'
+
+    hedger = Hedger(_warm_tracker(), HedgeBudget(ratio=1), min_delay=0.01)
+    try:
+        assert hedger.call('London', fetch) == 'fast'
+        assert hedger.hedges_sent == 1
+    finally:
+        release.set()
+
+def test_hedger_respects_budget():
+    """Test that no hedge is sent when the budget is empty."""
+    hedger = Hedger(_warm_tracker(), HedgeBudget(ratio=0), min_delay=0.01)
+    assert hedger.call('London', lambda: 'ok') == 'ok'
+    hedger.tracker.record('London', 0.001)
+
+    def slow():
+        threading.Event().wait(0.05)
+        return 'slow'
+
+    assert hedger.call('London', slow) == 'slow'
+    assert hedger.hedges_sent == 0
+
+def test_hedger_raises_when_all_attempts_fail():
+    """Test that the primary error surfaces if no attempt succeeds."""
+    def fail():
+        raise ValueError('boom')
+
+    hedger = Hedger(_warm_tracker(), HedgeBudget(ratio=1), min_delay=0.01)
+    with pytest.raises(ValueError):
+        hedger.call('London', fail)
+
+def test_hedger_isolates_hung_service():
+    """Test that calls hanging on one service do not hold up calls to another."""
+    release = threading.Event()
+    tracker = _warm_tracker()
+    tracker.record('Fast', 0.01)
+    hedger = Hedger(tracker, HedgeBudget(ratio=0), min_delay=0.01, max_workers=4)
+
+    callers = [threading.Thread(target=hedger.call, args=('London', release.wait, 5), daemon=True)
+               for _ in range(4)]
+    try:
+        for caller in callers:
+            caller.start()
+        answered = []
+        fast = threading.Thread(target=lambda: answered.append(hedger.call('Fast', lambda: 'ok')), daemon=True)
+        fast.start()
+        fast.join(1)
+        assert answered == ['ok']
+    finally:
+        release.set()
+
+def test_hedger_timeout():
+    """Test that the caller stops waiting on a hung call after the timeout."""
+    release = threading.Event()
+    hedger = Hedger(_warm_tracker(), HedgeBudget(ratio=1), min_delay=0.01)
+    try:
+        with pytest.raises(TimeoutError):
+            hedger.call('London', release.wait, 5, timeout=0.1)
+        assert hedger.hedges_sent == 1
+    finally:
+        release.set()
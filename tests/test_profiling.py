@@ -0,0 +1,87 @@
+import time
+import pytest
+from services.profiling import PhaseTimer, ProfileWindow
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_phase_timer_server_timing():
+    """Test that phases accumulate and format as a Server-Timing header."""
+    clock = FakeClock()
+    timer = PhaseTimer(clock=clock)
+    for _ in range(2):
+        with timer.phase('upstream-London'):
+            clock.now += 0.010
+    with timer.phase('sort'):
+        clock.now += 0.001
+
+    assert timer.phases == pytest.approx({'upstream-London': 0.020, 'sort': 0.001})
+    assert timer.server_timing() == 'upstream-london;dur=20.00, sort;dur=1.00, total;dur=21.00'
+
+def test_profile_window_validation():
+    """Test that invalid windows are rejected."""
+    with pytest.raises(ValueError):
+        ProfileWindow(requests=1, mode='disk')
+    with pytest.raises(ValueError):
+        ProfileWindow(requests=0)
+
+def test_cpu_profile_window():
+    """Test that a CPU window samples request stacks and finishes after N requests."""
+    window = ProfileWindow(requests=2, mode='cpu', interval=0.001)
+    for _ in range(2):
+        assert window.begin_request()
+        deadline = time.perf_counter() + 0.02
+        while time.perf_counter() < deadline:
+            pass
+        window.end_request()
+    assert not window.begin_request()
+    assert window.finished.is_set()
+
+    lines = window.folded().splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(' ', 1)
+    assert 'test_cpu_profile_window' in stack
+    assert int(count) > 0
+
+def test_memory_profile_window():
+    """Test that a memory window exports allocation sites."""
+    window = ProfileWindow(requests=1, mode='memory')
+    assert window.begin_request()
+    assert window.folded() == ''
+    data = [bytearray(1024) for _ in range(100)]
+    window.end_request()
+    assert window.finished.is_set()
+    assert 'test_profiling.py' in window.folded()
+    del data
+
+def test_profile_window_time_limit():
+    """Test that a started window finishes after its wall-clock limit without more requests."""
+    window = ProfileWindow(requests=100, mode='memory', max_seconds=0.05)
+    assert window.begin_request()
+    data = [bytearray(1024) for _ in range(100)]
+    window.end_request()
+    assert window.finished.wait(2)
+    assert not window.begin_request()
+    assert 'test_profiling.py' in window.folded()
+    del data
+
+def test_profile_window_stop():
+    """Test that stopping a window keeps the samples captured so far."""
+    window = ProfileWindow(requests=100, mode='cpu', interval=0.001)
+    assert window.begin_request()
+    deadline = time.perf_counter() + 0.02
+    while time.perf_counter() < deadline:
+        pass
+    window.stop()
+    assert window.finished.is_set()
+    assert window.folded()
+    window.end_request()
+    assert not window.begin_request()
+
+    unused = ProfileWindow(requests=1, mode='memory')
+    unused.stop()
+    assert unused.folded() == ''
@@ -0,0 +1,51 @@
+import pytest
+from services.reservations import SlotReservations, IdempotencyStore
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+def test_lease_blocks_other_owners(clock):
+    """Test that a held slot cannot be leased again until it expires."""
+    table = SlotReservations(lease_seconds=10, booked_seconds=100, clock=clock)
+    assert table.acquire('London', '1', 'a')
+    assert not table.acquire('London', '1', 'b')
+    assert table.acquire('Manchester', '1', 'b')
+
+    clock.now = 11
+    assert table.acquire('London', '1', 'b')
+
+def test_release_only_by_owner(clock):
+    """Test that only the lease owner can release it."""
+    table = SlotReservations(clock=clock)
+    table.acquire('London', 1, 'a')
+    table.release('London', '1', 'b')
+    assert table.is_held('London', '1')
+    table.release('London', '1', 'a')
+    assert not table.is_held('London', '1')
+
+def test_mark_booked_extends_hold(clock):
+    """Test that a booked slot stays held for the booked period."""
+    table = SlotReservations(lease_seconds=10, booked_seconds=100, clock=clock)
+    table.acquire('London', '1', 'a')
+    table.mark_booked('London', '1', 'a')
+    clock.now = 50
+    assert table.is_held('London', '1')
+    clock.now = 101
+    assert not table.is_held('London', '1')
+
+def test_idempotency_store_expiry(clock):
+    """Test that stored results are replayed until their TTL passes."""
+    store = IdempotencyStore(ttl_seconds=10, clock=clock)
+    assert store.get('key') is None
+    store.put('key', ('London', '1'), {'success': True})
+    assert store.get('key') == (('London', '1'), {'success': True})
+    clock.now = 10
+    assert store.get('key') is None
@@ -36,6 +36,8 @@ def test_services_dir(tmp_path):
     service_info = {
         "london": {
             "address": "Test London Address",
+            "latitude": 51.5596,
+            "longitude": -0.0573,
             "vehicle_types": ["Sõiduauto"]
         },
         "manchester": {
@@ -63,6 +65,7 @@ def test_load_services(test_services_dir):
     assert london.available_times_path == "/available-times"
     assert london.booking_path == "/booking"
     assert london.vehicle_types == ["Sõiduauto"]
+    assert (london.latitude, london.longitude) == (51.5596, -0.0573)
     
     # Test Manchester service
     manchester = next(s for s in services if s.name == "Manchester")
@@ -70,6 +73,7 @@ def test_load_services(test_services_dir):
     assert manchester.available_times_path == "/availableTimes"
     assert manchester.booking_path == "/make-booking"
     assert manchester.vehicle_types == ["Sõiduauto", "Veoauto"]
+    assert manchester.latitude is None and manchester.longitude is None
 
 def test_find_endpoint():
     """Test endpoint finding logic."""
@@ -156,3 +160,14 @@ def test_xml_content_type(test_services_dir):
     assert xml_service.content_type == "application/xml"
     assert xml_service.available_times_path == "/available"
     assert xml_service.booking_path == "/booking"
+
+def test_invalid_coordinates(test_services_dir):
+    """Test that invalid coordinates are ignored instead of failing the service."""
+    service_info = yaml.safe_load((test_services_dir / "service_info.yaml").read_text())
+    service_info["london"]["latitude"] = "north-ish"
+    service_info["manchester"].update({"latitude": 95, "longitude": 0})
+    (test_services_dir / "service_info.yaml").write_text(yaml.dump(service_info))
+
+    services = load_services(str(test_services_dir))
+    assert len(services) == 2
+    assert all(s.latitude is None and s.longitude is None for s in services)
@@ -0,0 +1,67 @@
+import threading
+from services.warmup import WarmupState, resolve_host, run_warmup
+from services.service_loader import Service
+
+def make_service(name, base_url='http://localhost:9003/api/v1'):
+    return Service(
+        name=name, version='1.0', base_url=base_url, content_type='application/json',
+        available_times_path='/available', booking_path='/booking', address='',
+        vehicle_types=['Car']
+    )
+
+def test_resolve_host():
+    """Test host resolution for valid and host-less URLs."""
+    assert resolve_host('http://localhost:9003/api/v1')
+    assert not resolve_host('/api/v1')
+
+def test_warmup_ready():
+    """Test that warm-up fetches every service and then reports ready."""
+    state = WarmupState()
+    assert not state.ready
+    completed = []
+
+    def fetch(service):
+        if service.name == 'Broken':
+            raise RuntimeError('boom')
+        return [service.name]
+
+    services = [make_service('London'), make_service('Manchester'), make_service('Broken')]
+    run_warmup(state, services, fetch, timeout=5, on_complete=completed.extend)
+
+    assert state.ready
+    assert state.status == WarmupState.READY
+    assert state.services['London'] == 'ok'
+    assert state.services['Broken'].startswith('failed')
+    assert sorted(completed) == [['London'], ['Manchester']]
+
+def test_warmup_timeout():
+    """Test that a hanging service cannot keep the worker out of rotation."""
+    state = WarmupState()
+    release = threading.Event()
+
+    def fetch(service):
+        if service.name == 'Slow':
+            release.wait(5)
+        return [service.name]
+
+    executor_threads = []
+    try:
+        run_warmup(state, [make_service('London'), make_service('Slow')], fetch, timeout=0.05)
+        assert state.ready
+        assert state.status == WarmupState.TIMED_OUT
+        assert state.services == {'London': 'ok', 'Slow': 'timed out'}
+        assert state.as_dict()['durationSeconds'] is not None
+        executor_threads = [t for t in threading.enumerate() if t.name.startswith('warmup')]
+    finally:
+        release.set()
+    for thread in executor_threads:
+        thread.join(1)
+    # The late answer does not overwrite the final outcome
+    assert state.services['Slow'] == 'timed out'
+
+def test_warmup_empty_result():
+    """Test that a workshop returning no times is not reported as ok."""
+    state = WarmupState()
+    run_warmup(state, [make_service('Down')], lambda service: [], timeout=5)
+    assert state.status == WarmupState.READY
+    assert state.services == {'Down': 'empty'}